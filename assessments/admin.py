@@ -1,12 +1,78 @@
 from django.contrib import admin
+from django.core.cache import cache
+from django.forms.models import BaseInlineFormSet
 from django.utils.html import format_html
 from django.urls import reverse
+from django.db.models import Case, CharField, Count, Value, When
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.lookups import GreaterThan
 from django.utils.safestring import mark_safe
 from .models import (
     Quiz, QuizQuestion, QuizTask, GradingCriterion, 
     QuizSubmission, QuestionResponse, SubmissionFile, 
     QuizGrade, TaskGrade, CriteriaGrade
 )
+from core.utils import DeferredChangeListMixin, FasterAdminPaginator
+from courses.models import Course
+
+
+def truncated(field, length=50):
+    """
+    Database expression returning the first ``length`` characters of
+    ``field`` followed by '...' when the value is longer than that
+    """
+    return Case(
+        When(
+            GreaterThan(Length(field), length),
+            then=Concat(Substr(field, 1, length), Value('...'))
+        ),
+        default=field,
+        output_field=CharField(),
+    )
+
+
+class CourseListFilter(admin.RelatedFieldListFilter):
+    """
+    Course sidebar filter whose choices are cached instead of being
+    re-queried on every changelist request
+    """
+    def field_choices(self, field, request, model_admin):
+        return cache.get_or_set(
+            'admin:course_choices',
+            lambda: list(Course.objects.order_by('title').values_list('id', 'title')),
+            300
+        )
+
+
+class ParentInstanceInlineFormSet(BaseInlineFormSet):
+    """
+    Points every row back at the parent instance already loaded for the
+    change view, so row labels that walk the parent (and its quiz or
+    student) reuse one object instead of fetching it again per row
+    """
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        setattr(form.instance, self.fk.name, self.instance)
+        return form
+
+
+class ParentScopedInlineMixin:
+    """
+    Remembers the parent object being edited so foreign key dropdowns
+    on the inline can be limited to rows that belong to it.
+    """
+    formset = ParentInstanceInlineFormSet
+    
+    def get_formset(self, request, obj=None, **kwargs):
+        request._obj_ = obj
+        return super().get_formset(request, obj, **kwargs)
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if formfield is not None:
+            # Evaluate the choices once for the formset instead of once per row
+            formfield.choices = list(formfield.choices)
+        return formfield
 
 
 class QuizQuestionInline(admin.TabularInline):
@@ -24,17 +90,19 @@ class QuizTaskInline(admin.TabularInline):
 
 
 @admin.register(Quiz)
-class QuizAdmin(admin.ModelAdmin):
+class QuizAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = [
         'title', 'course', 'section', 'lecture', 'due_date', 
         'points_possible', 'is_published', 'submission_count'
     ]
     list_filter = [
-        'is_published', 'allow_multiple_attempts', 'course', 
+        'is_published', 'allow_multiple_attempts', ('course', CourseListFilter), 
         'section', 'created_at', 'due_date'
     ]
     search_fields = ['title', 'description', 'course__title']
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ('course', 'section', 'lecture')
+    changelist_deferred_fields = ('description', 'instructions')
     date_hierarchy = 'due_date'
     
     fieldsets = (
@@ -56,12 +124,18 @@ class QuizAdmin(admin.ModelAdmin):
     inlines = [QuizQuestionInline, QuizTaskInline]
     
     def submission_count(self, obj):
-        count = obj.submissions.count()
+        count = obj._submission_count
         if count > 0:
-            url = reverse('admin:quizzes_quizsubmission_changelist') + f'?quiz__id__exact={obj.id}'
+            url = reverse('admin:assessments_quizsubmission_changelist') + f'?quiz__id__exact={obj.id}'
             return format_html('<a href="{}">{} submissions</a>', url, count)
         return '0 submissions'
     submission_count.short_description = 'Submissions'
+    submission_count.admin_order_field = '_submission_count'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _submission_count=Count('submissions')
+        )
 
 
 class GradingCriterionInline(admin.TabularInline):
@@ -77,9 +151,13 @@ class QuizTaskAdmin(admin.ModelAdmin):
         'title', 'quiz', 'required', 'accepts_files', 
         'accepts_text', 'points', 'order'
     ]
-    list_filter = ['required', 'accepts_files', 'accepts_text', 'quiz__course']
+    list_filter = [
+        'required', 'accepts_files', 'accepts_text',
+        ('quiz__course', CourseListFilter)
+    ]
     search_fields = ['title', 'description', 'quiz__title']
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ('quiz__course',)
     
     fieldsets = (
         ('Basic Information', {
@@ -104,14 +182,16 @@ class QuizTaskAdmin(admin.ModelAdmin):
 
 
 @admin.register(QuizQuestion)
-class QuizQuestionAdmin(admin.ModelAdmin):
+class QuizQuestionAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = [
         'quiz', 'question_type', 'truncated_question', 
         'points', 'order'
     ]
-    list_filter = ['question_type', 'quiz__course', 'points']
+    list_filter = ['question_type', ('quiz__course', CourseListFilter), 'points']
     search_fields = ['question', 'quiz__title']
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ('quiz__course',)
+    changelist_deferred_fields = ('question', 'explanation')
     
     fieldsets = (
         ('Question Details', {
@@ -126,24 +206,41 @@ class QuizQuestionAdmin(admin.ModelAdmin):
         })
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_question_short=truncated('question'))
+    
     def truncated_question(self, obj):
-        return obj.question[:50] + '...' if len(obj.question) > 50 else obj.question
+        return obj._question_short
     truncated_question.short_description = 'Question'
 
 
-class QuestionResponseInline(admin.TabularInline):
+class QuestionResponseInline(ParentScopedInlineMixin, admin.TabularInline):
     model = QuestionResponse
     fields = ('question', 'answer', 'is_correct', 'points_awarded')
     readonly_fields = ('question',)
     extra = 0
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('question', 'question__quiz')
 
 
-class SubmissionFileInline(admin.TabularInline):
+class SubmissionFileInline(ParentScopedInlineMixin, admin.TabularInline):
     model = SubmissionFile
     fields = ('task', 'name', 'type', 'size', 'file_link')
     readonly_fields = ('file_link', 'size')
     extra = 0
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('task')
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        submission = getattr(request, '_obj_', None)
+        if db_field.name == 'task' and submission is not None:
+            kwargs['queryset'] = QuizTask.objects.filter(
+                quiz_id=submission.quiz_id
+            ).select_related('quiz')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    
     def file_link(self, obj):
         if obj.url:
             return format_html('<a href="{}" target="_blank">View File</a>', obj.url)
@@ -152,13 +249,13 @@ class SubmissionFileInline(admin.TabularInline):
 
 
 @admin.register(QuizSubmission)
-class QuizSubmissionAdmin(admin.ModelAdmin):
+class QuizSubmissionAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = [
         'student_email', 'quiz_title', 'attempt_number', 
         'status', 'grade', 'submitted_at', 'time_spent_display'
     ]
     list_filter = [
-        'status', 'quiz__course', 'submitted_at', 'quiz'
+        'status', ('quiz__course', CourseListFilter), 'submitted_at'
     ]
     search_fields = [
         'student__email', 'student__first_name', 'student__last_name', 
@@ -167,7 +264,11 @@ class QuizSubmissionAdmin(admin.ModelAdmin):
     readonly_fields = [
         'created_at', 'updated_at', 'started_at', 'time_spent_seconds'
     ]
-    date_hierarchy = 'submitted_at'
+    list_select_related = ('student', 'quiz', 'quiz__course')
+    changelist_deferred_fields = ('text_response', 'feedback', 'instructor_notes')
+    autocomplete_fields = ['student', 'quiz']
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Submission Info', {
@@ -210,7 +311,7 @@ class QuizSubmissionAdmin(admin.ModelAdmin):
 
 
 @admin.register(QuestionResponse)
-class QuestionResponseAdmin(admin.ModelAdmin):
+class QuestionResponseAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = [
         'submission_student', 'question_text', 'answer_display', 
         'is_correct', 'points_awarded'
@@ -222,43 +323,69 @@ class QuestionResponseAdmin(admin.ModelAdmin):
         'submission__student__email', 'question__question'
     ]
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ('submission__student', 'question')
+    changelist_deferred_fields = (
+        'answer', 'feedback',
+        'question__question', 'question__options', 'question__correct_answer', 'question__explanation',
+        'submission__text_response', 'submission__feedback', 'submission__instructor_notes',
+    )
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _question_short=truncated('question__question')
+        )
     
     def submission_student(self, obj):
         return obj.submission.student.email
     submission_student.short_description = 'Student'
     
     def question_text(self, obj):
-        return obj.question.question[:50] + '...' if len(obj.question.question) > 50 else obj.question.question
+        return obj._question_short
     question_text.short_description = 'Question'
     
     def answer_display(self, obj):
-        if isinstance(obj.answer, list):
-            return ', '.join(str(item) for item in obj.answer)
-        return str(obj.answer) if obj.answer else '-'
+        return obj.answer_display or '-'
     answer_display.short_description = 'Answer'
+    answer_display.admin_order_field = 'answer_display'
 
 
-class TaskGradeInline(admin.TabularInline):
+class TaskGradeInline(ParentScopedInlineMixin, admin.TabularInline):
     model = TaskGrade
     fields = ('task', 'score', 'feedback')
     extra = 0
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('task')
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        grade = getattr(request, '_obj_', None)
+        if db_field.name == 'task' and grade is not None:
+            kwargs['queryset'] = QuizTask.objects.filter(
+                quiz_id=grade.quiz_id
+            ).select_related('quiz')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(QuizGrade)
-class QuizGradeAdmin(admin.ModelAdmin):
+class QuizGradeAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = [
         'student_email', 'quiz_title', 'overall_score', 
         'graded_by', 'graded_at', 'is_final'
     ]
     list_filter = [
-        'is_final', 'quiz__course', 'graded_at', 'graded_by'
+        'is_final', ('quiz__course', CourseListFilter), 'graded_at'
     ]
     search_fields = [
         'student__email', 'student__first_name', 'student__last_name',
         'quiz__title'
     ]
     readonly_fields = ['created_at', 'updated_at', 'graded_at']
-    date_hierarchy = 'graded_at'
+    list_select_related = ('student', 'quiz', 'graded_by')
+    changelist_deferred_fields = ('feedback',)
+    show_full_result_count = False
+    autocomplete_fields = ['student', 'graded_by', 'quiz']
     
     fieldsets = (
         ('Grade Information', {
@@ -288,25 +415,46 @@ class QuizGradeAdmin(admin.ModelAdmin):
     quiz_title.admin_order_field = 'quiz__title'
 
 
-class CriteriaGradeInline(admin.TabularInline):
+class CriteriaGradeInline(ParentScopedInlineMixin, admin.TabularInline):
     model = CriteriaGrade
     fields = ('criterion', 'awarded_points', 'comments')
     extra = 0
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('criterion', 'criterion__task')
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        task_grade = getattr(request, '_obj_', None)
+        if db_field.name == 'criterion' and task_grade is not None:
+            kwargs['queryset'] = GradingCriterion.objects.filter(
+                task_id=task_grade.task_id
+            ).select_related('task__quiz')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(TaskGrade)
 class TaskGradeAdmin(admin.ModelAdmin):
     list_display = ['grade_info', 'task_title', 'score', 'max_points']
-    list_filter = ['task__quiz__course', 'grade__graded_at']
+    list_filter = [('task__quiz__course', CourseListFilter), 'grade__graded_at']
     search_fields = [
         'grade__student__email', 'task__title', 'grade__quiz__title'
     ]
+    list_select_related = ('task',)
     
     inlines = [CriteriaGradeInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _grade_info=Concat(
+                'grade__student__email', Value(' - '), 'grade__quiz__title',
+                output_field=CharField()
+            )
+        )
+    
     def grade_info(self, obj):
-        return f"{obj.grade.student.email} - {obj.grade.quiz.title}"
+        return obj._grade_info
     grade_info.short_description = 'Student - Quiz'
+    grade_info.admin_order_field = '_grade_info'
     
     def task_title(self, obj):
         return obj.task.title
@@ -318,17 +466,22 @@ class TaskGradeAdmin(admin.ModelAdmin):
 
 
 @admin.register(GradingCriterion)
-class GradingCriterionAdmin(admin.ModelAdmin):
+class GradingCriterionAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = ['task_info', 'description_short', 'points', 'order']
-    list_filter = ['task__quiz__course', 'points']
+    list_filter = [('task__quiz__course', CourseListFilter), 'points']
     search_fields = ['description', 'task__title', 'task__quiz__title']
+    list_select_related = ('task__quiz',)
+    changelist_deferred_fields = ('description',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_description_short=truncated('description'))
     
     def task_info(self, obj):
         return f"{obj.task.quiz.title} - {obj.task.title}"
     task_info.short_description = 'Quiz - Task'
     
     def description_short(self, obj):
-        return obj.description[:50] + '...' if len(obj.description) > 50 else obj.description
+        return obj._description_short
     description_short.short_description = 'Description'
 
 
@@ -338,25 +491,33 @@ class SubmissionFileAdmin(admin.ModelAdmin):
         'name', 'submission_info', 'type', 'size_display', 
         'file_link', 'created_at'
     ]
-    list_filter = ['type', 'submission__quiz__course', 'created_at']
+    list_filter = [
+        'type', ('submission__quiz__course', CourseListFilter), 'created_at'
+    ]
     search_fields = [
         'name', 'submission__student__email', 'submission__quiz__title'
     ]
     readonly_fields = ['created_at', 'updated_at', 'size']
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _submission_info=Concat(
+                'submission__student__email', Value(' - '), 'submission__quiz__title',
+                output_field=CharField()
+            )
+        )
     
     def submission_info(self, obj):
-        return f"{obj.submission.student.email} - {obj.submission.quiz.title}"
+        return obj._submission_info
     submission_info.short_description = 'Student - Quiz'
+    submission_info.admin_order_field = '_submission_info'
     
     def size_display(self, obj):
-        size = obj.size
-        if size < 1024:
-            return f"{size} B"
-        elif size < 1024 * 1024:
-            return f"{size / 1024:.1f} KB"
-        else:
-            return f"{size / (1024 * 1024):.1f} MB"
+        return obj.size_human
     size_display.short_description = 'Size'
+    size_display.admin_order_field = 'size'
     
     def file_link(self, obj):
         if obj.url:
@@ -366,22 +527,34 @@ class SubmissionFileAdmin(admin.ModelAdmin):
 
 
 @admin.register(CriteriaGrade)
-class CriteriaGradeAdmin(admin.ModelAdmin):
+class CriteriaGradeAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = [
         'student_info', 'criterion_description', 'awarded_points', 
         'max_points'
     ]
-    list_filter = ['task_grade__grade__quiz__course']
+    list_filter = [('task_grade__grade__quiz__course', CourseListFilter)]
     search_fields = [
         'task_grade__grade__student__email', 'criterion__description'
     ]
+    list_select_related = ('criterion',)
+    changelist_deferred_fields = ('criterion__description',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _student_info=Concat(
+                'task_grade__grade__student__email', Value(' - '), 'task_grade__task__title',
+                output_field=CharField()
+            ),
+            _criterion_short=truncated('criterion__description')
+        )
     
     def student_info(self, obj):
-        return f"{obj.task_grade.grade.student.email} - {obj.task_grade.task.title}"
+        return obj._student_info
     student_info.short_description = 'Student - Task'
+    student_info.admin_order_field = '_student_info'
     
     def criterion_description(self, obj):
-        return obj.criterion.description[:50] + '...' if len(obj.criterion.description) > 50 else obj.criterion.description
+        return obj._criterion_short
     criterion_description.short_description = 'Criterion'
     
     def max_points(self, obj):
@@ -1,8 +1,36 @@
 from django.db import models
 from django.core.exceptions import ValidationError
-from django.db.models import JSONField
+from django.db.models import JSONField, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
 import uuid
 from core.models import BaseModel
+from core.utils import UnicodeJSONEncoder, uuid7
+
+
+class JSONArrayLength(models.Func):
+    """Length of a JSON array column, usable in queries and constraints"""
+    function = 'JSON_ARRAY_LENGTH'
+    output_field = models.IntegerField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='JSONB_ARRAY_LENGTH', **extra_context)
+
+
+def validate_json_list(value):
+    if value is not None and not isinstance(value, list):
+        raise ValidationError("Value must be a list")
+
+
+def validate_file_type_list(value):
+    if not value:
+        return
+    if not isinstance(value, list):
+        raise ValidationError("Accepted file types must be a list")
+    for file_type in value:
+        if not isinstance(file_type, str) or file_type not in QuizTask.SUBMISSION_FILE_TYPES:
+            raise ValidationError(f"Invalid file type: {file_type}")
+
 
 class Quiz(BaseModel):
     course = models.ForeignKey('courses.Course', on_delete=models.CASCADE, related_name='quizzes')
@@ -21,23 +49,33 @@ class Quiz(BaseModel):
     class Meta:
         verbose_name_plural = "Quizzes"
         ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['due_date']),
+            models.Index(fields=['course', 'due_date']),
+            models.Index(fields=['course', 'is_published', 'due_date']),
+        ]
     
     def __str__(self):
         return f"{self.course.title} - {self.title}"
 
+    @classmethod
+    def touch(cls, **lookup):
+        """Bump updated_at so cached renderings of the quiz are not reused"""
+        cls.objects.filter(**lookup).update(updated_at=timezone.now())
+
     def clean(self):
         if self.max_attempts is not None and self.max_attempts < 1:
             raise ValidationError("Max attempts must be at least 1")
         if self.time_limit_minutes is not None and self.time_limit_minutes < 1:
             raise ValidationError("Time limit must be at least 1 minute")
                 # Validate hierarchy
-        if self.lecture and not self.section:
+        if self.lecture_id and not self.section_id:
             raise ValidationError("Lecture must belong to a section")
             
-        if self.section and self.section.course != self.course:
+        if self.section_id and self.section.course_id != self.course_id:
             raise ValidationError("Section does not belong to course")
             
-        if self.lecture and self.lecture.section != self.section:
+        if self.lecture_id and self.lecture.section_id != self.section_id:
             raise ValidationError("Lecture does not belong to section")
 
 class QuizQuestion(BaseModel):
@@ -49,11 +87,13 @@ class QuizQuestion(BaseModel):
         ('matching', 'Matching'),
         ('fill_in_blank', 'Fill in the Blank'),
     ]
+    AUTO_GRADED_TYPES = frozenset({'multiple_choice', 'true_false'})
+    TEXT_ANSWER_TYPES = frozenset({'short_answer', 'essay'})
     
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='questions')
     question_type = models.CharField(max_length=20, choices=QUESTION_TYPES, default='multiple_choice')
     question = models.TextField()
-    options = JSONField(blank=True, null=True)  # List of strings for multiple choice
+    options = JSONField(blank=True, null=True, encoder=UnicodeJSONEncoder, validators=[validate_json_list])  # List of strings for multiple choice
     correct_option_index = models.PositiveIntegerField(blank=True, null=True)
     correct_answer = models.TextField(blank=True, null=True)  # For short answer/essay
     points = models.PositiveIntegerField(default=1)
@@ -62,19 +102,41 @@ class QuizQuestion(BaseModel):
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['quiz', 'order']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(correct_option_index__isnull=True) | Q(correct_option_index__lt=JSONArrayLength('options')),
+                name='quizquestion_correct_option_in_range',
+            ),
+            models.CheckConstraint(
+                check=~Q(question_type__in=['multiple_choice', 'true_false']) | Q(correct_option_index__isnull=False),
+                name='quizquestion_auto_graded_has_correct_option',
+            ),
+        ]
 
     def clean(self):
-        if self.question_type in ['multiple_choice', 'true_false']:
+        if self.question_type in self.AUTO_GRADED_TYPES:
             if not isinstance(self.options, list) or len(self.options) < 2:
                 raise ValidationError("Options must be a list with at least 2 items")
             if self.correct_option_index is None:
                 raise ValidationError("Correct option index is required")
             if self.correct_option_index >= len(self.options):
                 raise ValidationError("Correct option index is out of range")
-        elif self.question_type in ['short_answer', 'essay']:
+        elif self.question_type in self.TEXT_ANSWER_TYPES:
             if not self.correct_answer:
                 raise ValidationError("Correct answer is required for this question type")
 
+    @staticmethod
+    def normalize_answer(value):
+        """Comparison form of a free-text answer"""
+        return str(value).strip().lower()
+
+    @cached_property
+    def normalized_correct_answer(self):
+        return self.normalize_answer(self.correct_answer)
+
     def __str__(self):
         return f"Question for {self.quiz.title}"
 
@@ -87,13 +149,16 @@ class QuizTask(BaseModel):
         ('document', 'Document'),
         ('code', 'Code'),
     ]
+    SUBMISSION_FILE_TYPES = frozenset(value for value, _ in SUBMISSION_FILE_TYPE_CHOICES)
     
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='tasks')
     title = models.CharField(max_length=200)
     description = models.TextField()
     required = models.BooleanField(default=True)
     accepts_files = models.BooleanField(default=False)
-    accepted_file_types = JSONField(blank=True, null=True)  # List of SUBMISSION_FILE_TYPE_CHOICES
+    accepted_file_types = JSONField(
+        blank=True, null=True, encoder=UnicodeJSONEncoder, validators=[validate_file_type_list]
+    )  # List of SUBMISSION_FILE_TYPE_CHOICES
     max_file_size = models.PositiveIntegerField(blank=True, null=True)  # in bytes
     max_files = models.PositiveIntegerField(blank=True, null=True)
     accepts_text = models.BooleanField(default=False)
@@ -101,13 +166,13 @@ class QuizTask(BaseModel):
     points = models.PositiveIntegerField(default=10)
     order = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz', 'order']),
+        ]
+
     def clean(self):
-        if self.accepted_file_types and not isinstance(self.accepted_file_types, list):
-            raise ValidationError("Accepted file types must be a list")
-        if self.accepted_file_types:
-            for file_type in self.accepted_file_types:
-                if file_type not in dict(self.SUBMISSION_FILE_TYPE_CHOICES).keys():
-                    raise ValidationError(f"Invalid file type: {file_type}")
+        # accepted_file_types is checked by its field validator during full_clean()
         if not self.accepts_files and not self.accepts_text:
             raise ValidationError("Task must accept either files or text")
 
@@ -123,6 +188,9 @@ class GradingCriterion(BaseModel):
     class Meta:
         verbose_name_plural = "Grading Criteria"
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['task', 'order']),
+        ]
 
     def __str__(self):
         return f"Criterion for {self.task}"
@@ -150,32 +218,61 @@ class QuizSubmission(BaseModel):
     class Meta:
         unique_together = ['student', 'quiz', 'attempt_number']
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['submitted_at']),
+            models.Index(fields=['quiz', '-submitted_at']),
+            models.Index(fields=['quiz', 'status']),
+            models.Index(fields=['quiz', '-started_at']),
+            models.Index(fields=['student', '-started_at']),
+        ]
 
     def __str__(self):
         return f"{self.student.email}'s submission for {self.quiz.title}"
 
 class QuestionResponse(BaseModel):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     submission = models.ForeignKey(QuizSubmission, on_delete=models.CASCADE, related_name='question_responses')
     question = models.ForeignKey(QuizQuestion, on_delete=models.CASCADE)
-    answer = JSONField(blank=True, null=True)  # Can be text, option index, etc.
+    answer = JSONField(blank=True, null=True, encoder=UnicodeJSONEncoder)  # Can be text, option index, etc.
+    answer_display = models.CharField(max_length=500, blank=True, editable=False)  # Flattened answer for listings
     is_correct = models.BooleanField(blank=True, null=True)
     points_awarded = models.FloatField(blank=True, null=True)
     feedback = models.TextField(blank=True, null=True)
 
+    def save(self, *args, **kwargs):
+        if isinstance(self.answer, list):
+            display = ', '.join(str(item) for item in self.answer)
+        else:
+            display = str(self.answer) if self.answer else ''
+        self.answer_display = display[:500]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Response for question {self.question.id} in submission {self.submission.id}"
 
 class SubmissionFile(BaseModel):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     submission = models.ForeignKey(QuizSubmission, on_delete=models.CASCADE, related_name='files')
     task = models.ForeignKey(QuizTask, on_delete=models.CASCADE, null=True, blank=True)
     url = models.URLField(max_length=500)
     type = models.CharField(max_length=10, choices=QuizTask.SUBMISSION_FILE_TYPE_CHOICES)
     name = models.CharField(max_length=200)
     size = models.PositiveIntegerField()  # in bytes
+    size_human = models.CharField(max_length=16, blank=True, editable=False)  # e.g. "1.5 MB"
     mime_type = models.CharField(max_length=100)
     thumbnail_url = models.URLField(max_length=500, blank=True, null=True)
     duration = models.PositiveIntegerField(blank=True, null=True)  # in seconds
 
+    def save(self, *args, **kwargs):
+        size = self.size or 0
+        if size < 1024:
+            self.size_human = f"{size} B"
+        elif size < 1024 * 1024:
+            self.size_human = f"{size / 1024:.1f} KB"
+        else:
+            self.size_human = f"{size / (1024 * 1024):.1f} MB"
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"File for {self.submission}"
 
@@ -197,11 +294,17 @@ class QuizGrade(BaseModel):
     class Meta:
         unique_together = ['quiz', 'student']
         ordering = ['-graded_at']
+        indexes = [
+            models.Index(fields=['graded_at']),
+            models.Index(fields=['quiz', '-graded_at']),
+            models.Index(fields=['student', '-graded_at']),
+        ]
 
     def __str__(self):
         return f"Grade for {self.student.email} on {self.quiz.title}"
 
 class TaskGrade(BaseModel):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     grade = models.ForeignKey(QuizGrade, on_delete=models.CASCADE, related_name='task_grades')
     task = models.ForeignKey(QuizTask, on_delete=models.CASCADE, related_name='grades')
     score = models.FloatField()
@@ -211,6 +314,7 @@ class TaskGrade(BaseModel):
         return f"Task grade for {self.grade}"
 
 class CriteriaGrade(BaseModel):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     task_grade = models.ForeignKey(TaskGrade, on_delete=models.CASCADE, related_name='criteria_grades')
     criterion = models.ForeignKey(GradingCriterion, on_delete=models.CASCADE, related_name='grades')
     awarded_points = models.PositiveIntegerField()
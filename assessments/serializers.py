@@ -7,20 +7,27 @@ from core.serializers import EmptySerializer
 class GradingCriterionSerializer(serializers.ModelSerializer):
     class Meta:
         model = GradingCriterion
-        fields = '__all__'
-
-# assessments/serializers.py
+        fields = ['id', 'task', 'description', 'points', 'order', 'created_at', 'updated_at']
 
 class QuizQuestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuizQuestion
-        fields = '__all__'
+        fields = [
+            'id', 'quiz', 'question_type', 'question', 'options', 'correct_option_index',
+            'correct_answer', 'points', 'explanation', 'order', 'created_at', 'updated_at'
+        ]
         read_only_fields = ('quiz',)
 
 class QuizTaskSerializer(serializers.ModelSerializer):
+    grading_criteria = GradingCriterionSerializer(many=True, read_only=True)
+
     class Meta:
         model = QuizTask
-        fields = '__all__'
+        fields = [
+            'id', 'quiz', 'title', 'description', 'required', 'accepts_files',
+            'accepted_file_types', 'max_file_size', 'max_files', 'accepts_text',
+            'sample_answer', 'points', 'order', 'grading_criteria', 'created_at', 'updated_at'
+        ]
         read_only_fields = ('quiz',)
 
 class QuizSerializer(serializers.ModelSerializer):
@@ -29,22 +36,41 @@ class QuizSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Quiz
-        fields = '__all__'
+        fields = [
+            'id', 'course', 'section', 'lecture', 'title', 'description', 'instructions',
+            'due_date', 'points_possible', 'is_published', 'allow_multiple_attempts',
+            'max_attempts', 'time_limit_minutes', 'questions', 'tasks', 'created_at', 'updated_at'
+        ]
         extra_kwargs = {
             'course': {'required': True},
             'section': {'required': False},
             'lecture': {'required': False}
         }
 
+class QuizListSerializer(QuizSerializer):
+    """Quiz list rows without the long description and instructions texts"""
+    class Meta(QuizSerializer.Meta):
+        fields = [
+            'id', 'course', 'section', 'lecture', 'title', 'due_date', 'points_possible',
+            'is_published', 'allow_multiple_attempts', 'max_attempts', 'time_limit_minutes',
+            'questions', 'tasks', 'created_at', 'updated_at'
+        ]
+
 class SubmissionFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = SubmissionFile
-        fields = '__all__'
+        fields = [
+            'id', 'submission', 'task', 'url', 'type', 'name', 'size', 'size_human',
+            'mime_type', 'thumbnail_url', 'duration', 'created_at', 'updated_at'
+        ]
 
 class QuestionResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuestionResponse
-        fields = '__all__'
+        fields = [
+            'id', 'submission', 'question', 'answer', 'answer_display', 'is_correct',
+            'points_awarded', 'feedback', 'created_at', 'updated_at'
+        ]
 
 class QuizSubmissionSerializer(serializers.ModelSerializer):
     files = SubmissionFileSerializer(many=True, read_only=True)
@@ -52,24 +78,68 @@ class QuizSubmissionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = QuizSubmission
-        fields = '__all__'
+        fields = [
+            'id', 'student', 'quiz', 'attempt_number', 'submitted_at', 'started_at',
+            'text_response', 'status', 'grade', 'feedback', 'instructor_notes',
+            'time_spent_seconds', 'files', 'question_responses', 'created_at', 'updated_at'
+        ]
         read_only_fields = ['student', 'attempt_number', 'started_at']
 
+class QuizSubmissionListSerializer(QuizSubmissionSerializer):
+    """Submission list rows without the free-text response, feedback and notes"""
+    class Meta(QuizSubmissionSerializer.Meta):
+        fields = [
+            'id', 'student', 'quiz', 'attempt_number', 'submitted_at', 'started_at',
+            'status', 'grade', 'time_spent_seconds', 'files', 'question_responses',
+            'created_at', 'updated_at'
+        ]
+
 class CriteriaGradeSerializer(serializers.ModelSerializer):
     class Meta:
         model = CriteriaGrade
-        fields = '__all__'
+        fields = ['id', 'task_grade', 'criterion', 'awarded_points', 'comments', 'created_at', 'updated_at']
 
 class TaskGradeSerializer(serializers.ModelSerializer):
     criteria_grades = CriteriaGradeSerializer(many=True, read_only=True)
 
     class Meta:
         model = TaskGrade
-        fields = '__all__'
+        fields = ['id', 'grade', 'task', 'score', 'feedback', 'criteria_grades', 'created_at', 'updated_at']
 
 class QuizGradeSerializer(serializers.ModelSerializer):
     task_grades = TaskGradeSerializer(many=True, read_only=True)
+    computed_total = serializers.FloatField(read_only=True)
 
     class Meta:
         model = QuizGrade
-        fields = '__all__'
\ No newline at end of file
+        fields = [
+            'id', 'quiz', 'student', 'overall_score', 'feedback', 'graded_by', 'graded_at',
+            'is_final', 'task_grades', 'computed_total', 'created_at', 'updated_at'
+        ]
+
+class QuizGradeListSerializer(QuizGradeSerializer):
+    """Grade list rows without the overall feedback text"""
+    class Meta(QuizGradeSerializer.Meta):
+        fields = [
+            'id', 'quiz', 'student', 'overall_score', 'graded_by', 'graded_at',
+            'is_final', 'task_grades', 'computed_total', 'created_at', 'updated_at'
+        ]
+
+
+class CriteriaGradeInputSerializer(serializers.Serializer):
+    criterion = serializers.UUIDField()
+    awarded_points = serializers.IntegerField(min_value=0)
+    comments = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class TaskGradeInputSerializer(serializers.Serializer):
+    task = serializers.UUIDField()
+    score = serializers.FloatField()
+    feedback = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    criteria_grades = CriteriaGradeInputSerializer(many=True, required=False)
+
+class SubmissionGradeSerializer(serializers.Serializer):
+    """Payload for grading a submission with its task and criteria grades in one request"""
+    overall_score = serializers.FloatField()
+    feedback = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    is_final = serializers.BooleanField(default=True)
+    task_grades = TaskGradeInputSerializer(many=True, required=False)
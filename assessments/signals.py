@@ -0,0 +1,20 @@
+# signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import GradingCriterion, Quiz, QuizQuestion, QuizTask
+
+
+# Quiz responses are cached per quiz updated_at, so nested edits must bump it.
+# post_delete also fires for each row of queryset deletes and cascades.
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+@receiver(post_save, sender=QuizTask)
+@receiver(post_delete, sender=QuizTask)
+def touch_quiz(sender, instance, **kwargs):
+    Quiz.touch(pk=instance.quiz_id)
+
+
+@receiver(post_save, sender=GradingCriterion)
+@receiver(post_delete, sender=GradingCriterion)
+def touch_criterion_quiz(sender, instance, **kwargs):
+    Quiz.touch(tasks=instance.task_id)
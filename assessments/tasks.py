@@ -0,0 +1,105 @@
+# tasks.py
+from celery import shared_task
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import QuestionResponse, QuizGrade, QuizQuestion, QuizSubmission
+
+
+def _grade_choice(response, question):
+    return response.answer == question.correct_option_index
+
+
+def _grade_short_answer(response, question):
+    # Simple exact match for short answer; ungradable without a reference answer
+    if not question.correct_answer:
+        return None
+    return QuizQuestion.normalize_answer(response.answer) == question.normalized_correct_answer
+
+
+# question_type -> grader returning True/False, or None to leave the response ungraded
+_GRADERS = {
+    'multiple_choice': _grade_choice,
+    'true_false': _grade_choice,
+    'short_answer': _grade_short_answer,
+}
+
+
+@shared_task(queue='grading')
+@transaction.atomic
+def grade_submission(submission_id, graded_by_id=None):
+    """
+    Auto-grade the choice and short-answer responses of a submitted quiz
+    attempt and record the percentage score. Returns the score, or None when
+    the submission is missing or no longer waiting to be graded.
+    All writes commit together, and the submission row stays locked until
+    then so concurrent runs cannot grade it twice.
+    """
+    submission = QuizSubmission.objects.select_for_update().filter(
+        pk=submission_id, status='submitted'
+    ).first()
+    if submission is None:
+        return None
+
+    # Load each response's question in the same query, minus its long text columns
+    responses = list(submission.question_responses.select_related('question').defer(
+        'question__question', 'question__explanation'
+    ))
+    graded_responses = []
+    for response in responses:
+        question = response.question
+        grader = _GRADERS.get(question.question_type)
+        if grader is None:
+            continue
+        is_correct = grader(response, question)
+        if is_correct is None:
+            continue
+        response.is_correct = is_correct
+        response.points_awarded = question.points if is_correct else 0
+        graded_responses.append(response)
+
+    # bulk_update skips save(), so stamp updated_at by hand
+    now = timezone.now()
+    for response in graded_responses:
+        response.updated_at = now
+    QuestionResponse.objects.bulk_update(
+        graded_responses, ['is_correct', 'points_awarded', 'updated_at'], batch_size=500
+    )
+
+    totals = submission.question_responses.aggregate(
+        total=Sum('points_awarded'),
+        possible=Sum('question__points')
+    )
+    total_points = totals['total'] or 0
+    possible_points = totals['possible'] or 0
+
+    # Calculate percentage score
+    if possible_points > 0:
+        percentage_score = (total_points / possible_points) * 100
+    else:
+        percentage_score = 0
+
+    # Update the existing grade in place; insert only when there is none yet
+    grade_values = {
+        'overall_score': percentage_score,
+        'graded_by_id': graded_by_id,
+        'is_final': False
+    }
+    existing_grade = QuizGrade.objects.filter(quiz_id=submission.quiz_id, student_id=submission.student_id)
+    if not existing_grade.update(updated_at=now, **grade_values):
+        try:
+            with transaction.atomic():
+                QuizGrade.objects.create(
+                    quiz_id=submission.quiz_id,
+                    student_id=submission.student_id,
+                    **grade_values
+                )
+        except IntegrityError:
+            # A concurrent grading run inserted the row first
+            existing_grade.update(updated_at=now, **grade_values)
+
+    submission.grade = percentage_score
+    submission.status = 'graded'
+    submission.save(update_fields=['grade', 'status', 'updated_at'])
+
+    return percentage_score
@@ -1,3 +1,228 @@
+from unittest import skipUnless
+
+from django.apps import apps
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authentication.models import User
+
+# The app is not in INSTALLED_APPS yet; its models only import once it is
+ASSESSMENTS_INSTALLED = apps.is_installed('assessments')
+if ASSESSMENTS_INSTALLED:
+    from courses.models import Course
+    from .models import (
+        CriteriaGrade, GradingCriterion, QuestionResponse, Quiz, QuizGrade, QuizQuestion,
+        QuizSubmission, QuizTask, TaskGrade,
+    )
+    from .tasks import grade_submission
+    from .views import QuizSubmissionViewSet, QuizViewSet
+
+
+@skipUnless(ASSESSMENTS_INSTALLED, 'assessments is not in INSTALLED_APPS')
+class GradingTestBase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.grader = User.objects.create_user('grader@example.com', 'password', is_staff=True)
+        cls.student = User.objects.create_user('student@example.com', 'password')
+        instructor = User.objects.create_instructor('instructor@example.com', 'password')
+        course = Course.objects.create(
+            title='Course', slug='course', description='Course', instructor=instructor
+        )
+        cls.quiz = Quiz.objects.create(
+            course=course, title='Quiz', description='Quiz', instructions='Answer everything'
+        )
+        cls.choice = QuizQuestion.objects.create(
+            quiz=cls.quiz, question='Pick b', question_type='multiple_choice',
+            options=['a', 'b', 'c'], correct_option_index=1, points=2,
+        )
+        cls.true_false = QuizQuestion.objects.create(
+            quiz=cls.quiz, question='True?', question_type='true_false',
+            options=['True', 'False'], correct_option_index=0, points=1,
+        )
+        cls.short_answer = QuizQuestion.objects.create(
+            quiz=cls.quiz, question='Capital of France', question_type='short_answer',
+            correct_answer='Paris', points=3,
+        )
+        cls.essay = QuizQuestion.objects.create(
+            quiz=cls.quiz, question='Discuss', question_type='essay',
+            correct_answer='Anything', points=4,
+        )
+
+    def setUp(self):
+        self.submission = QuizSubmission.objects.create(
+            student=self.student, quiz=self.quiz, status='submitted'
+        )
+        self.responses = {
+            question.pk: QuestionResponse.objects.create(
+                submission=self.submission, question=question, answer=answer
+            )
+            for question, answer in (
+                (self.choice, 1),
+                (self.true_false, 1),
+                (self.short_answer, '  paris '),
+                (self.essay, 'An essay'),
+            )
+        }
+
+
+class GradeSubmissionTaskTests(GradingTestBase):
+    def test_auto_grades_choice_and_short_answer_responses(self):
+        score = grade_submission(self.submission.pk, self.grader.pk)
+
+        # 2 + 3 of the 10 possible points; the essay stays ungraded
+        self.assertEqual(score, 50)
+        graded = {
+            response.question_id: (response.is_correct, response.points_awarded)
+            for response in QuestionResponse.objects.filter(submission=self.submission)
+        }
+        self.assertEqual(graded[self.choice.pk], (True, 2))
+        self.assertEqual(graded[self.true_false.pk], (False, 0))
+        self.assertEqual(graded[self.short_answer.pk], (True, 3))
+        self.assertEqual(graded[self.essay.pk], (None, None))
+
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'graded')
+        self.assertEqual(self.submission.grade, 50)
+        grade = QuizGrade.objects.get(quiz=self.quiz, student=self.student)
+        self.assertEqual(grade.overall_score, 50)
+        self.assertEqual(grade.graded_by, self.grader)
+        self.assertFalse(grade.is_final)
+
+    def test_regrade_updates_the_existing_grade(self):
+        grade_submission(self.submission.pk)
+        grade = QuizGrade.objects.get(quiz=self.quiz, student=self.student)
+
+        response = self.responses[self.true_false.pk]
+        response.answer = 0
+        response.save()
+        QuizSubmission.objects.filter(pk=self.submission.pk).update(status='submitted')
+
+        self.assertEqual(grade_submission(self.submission.pk, self.grader.pk), 60)
+        regraded = QuizGrade.objects.get(quiz=self.quiz, student=self.student)
+        self.assertEqual(regraded.pk, grade.pk)
+        self.assertEqual(regraded.overall_score, 60)
+        self.assertEqual(regraded.graded_by, self.grader)
+
+    def test_skips_submissions_not_waiting_for_grading(self):
+        QuizSubmission.objects.filter(pk=self.submission.pk).update(status='draft')
+
+        self.assertIsNone(grade_submission(self.submission.pk))
+        self.assertFalse(QuizGrade.objects.filter(quiz=self.quiz, student=self.student).exists())
+
+
+class SubmissionGradeActionTests(GradingTestBase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task = QuizTask.objects.create(quiz=cls.quiz, title='Task', description='Task')
+        cls.criteria = [
+            GradingCriterion.objects.create(task=cls.task, description='Clarity', points=5),
+            GradingCriterion.objects.create(task=cls.task, description='Accuracy', points=5),
+        ]
+        other_task = QuizTask.objects.create(quiz=cls.quiz, title='Other', description='Other')
+        cls.other_criterion = GradingCriterion.objects.create(
+            task=other_task, description='Other', points=5
+        )
+
+    def post_grade(self, payload):
+        request = APIRequestFactory().post('/', payload, format='json')
+        force_authenticate(request, user=self.grader)
+        view = QuizSubmissionViewSet.as_view({'post': 'grade'})
+        return view(request, pk=self.submission.pk)
+
+    def grade_payload(self, awarded_points):
+        return {
+            'overall_score': 85,
+            'feedback': 'Good work',
+            'task_grades': [{
+                'task': str(self.task.pk),
+                'score': 8,
+                'criteria_grades': [
+                    {'criterion': str(criterion.pk), 'awarded_points': points}
+                    for criterion, points in zip(self.criteria, awarded_points)
+                ],
+            }],
+        }
+
+    def test_grades_tasks_and_criteria_in_one_request(self):
+        response = self.post_grade(self.grade_payload([4, 5]))
+
+        self.assertEqual(response.status_code, 200)
+        grade = QuizGrade.objects.get(quiz=self.quiz, student=self.student)
+        self.assertEqual(grade.overall_score, 85)
+        self.assertTrue(grade.is_final)
+        task_grade = TaskGrade.objects.get(grade=grade)
+        self.assertEqual(task_grade.task_id, self.task.pk)
+        self.assertEqual(
+            sorted(CriteriaGrade.objects.filter(task_grade=task_grade).values_list('awarded_points', flat=True)),
+            [4, 5],
+        )
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, 'graded')
+        self.assertEqual(self.submission.grade, 85)
+
+    def test_regrading_replaces_task_and_criteria_grades(self):
+        self.post_grade(self.grade_payload([4, 5]))
+        response = self.post_grade(self.grade_payload([2, 3]))
+
+        self.assertEqual(response.status_code, 200)
+        grade = QuizGrade.objects.get(quiz=self.quiz, student=self.student)
+        self.assertEqual(TaskGrade.objects.filter(grade=grade).count(), 1)
+        self.assertEqual(
+            sorted(CriteriaGrade.objects.filter(task_grade__grade=grade).values_list('awarded_points', flat=True)),
+            [2, 3],
+        )
+
+    def test_rejects_criteria_of_another_task(self):
+        payload = self.grade_payload([4])
+        payload['task_grades'][0]['criteria_grades'].append(
+            {'criterion': str(self.other_criterion.pk), 'awarded_points': 1}
+        )
+
+        response = self.post_grade(payload)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(QuizGrade.objects.filter(quiz=self.quiz, student=self.student).exists())
+
+
+class QuizCacheInvalidationTests(GradingTestBase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task = QuizTask.objects.create(quiz=cls.quiz, title='Task', description='Task')
+        GradingCriterion.objects.create(task=cls.task, description='Clarity', points=5)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get_quiz(self, action, **kwargs):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.grader)
+        response = QuizViewSet.as_view({'get': action})(request, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        if action == 'list':
+            return next(quiz for quiz in response.data['results'] if quiz['id'] == str(self.quiz.pk))
+        return response.data
+
+    def assert_cached_views_show(self, questions, tasks):
+        for data in (self.get_quiz('retrieve', pk=self.quiz.pk), self.get_quiz('list')):
+            self.assertEqual(len(data['questions']), questions)
+            self.assertEqual(len(data['tasks']), tasks)
+
+    def test_queryset_delete_of_questions_refreshes_cached_quiz(self):
+        self.assert_cached_views_show(questions=4, tasks=1)
+
+        QuizQuestion.objects.filter(quiz=self.quiz).delete()
+
+        self.assert_cached_views_show(questions=0, tasks=1)
+
+    def test_queryset_delete_of_tasks_refreshes_cached_quiz(self):
+        self.assert_cached_views_show(questions=4, tasks=1)
+
+        # Cascades to the task's grading criteria
+        QuizTask.objects.filter(quiz=self.quiz).delete()
 
-# Create your tests here.
+        self.assert_cached_views_show(questions=4, tasks=0)
+        self.assertFalse(GradingCriterion.objects.filter(task__quiz=self.quiz).exists())
@@ -1,43 +1,95 @@
 # assessments/views.py
+import hashlib
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.pagination import CursorPagination
+from django.conf import settings
 from django.utils import timezone
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from core.views import BaseModelViewSet
-from core.permissions import IsCourseInstructor
+from core.utils import MultiSerializerViewSetMixin
 from .models import *
 from .serializers import *
+from .tasks import grade_submission
 from django.core.exceptions import PermissionDenied
-class QuizViewSet(BaseModelViewSet):
-    queryset = Quiz.objects.all()
-    serializer_class = QuizSerializer
+
+
+class SubmissionCursorPagination(CursorPagination):
+    # submitted_at is NULL for drafts, so seek on the always-set start time
+    ordering = '-started_at'
+
+
+class GradeCursorPagination(CursorPagination):
+    ordering = '-graded_at'
+
+
+class QuizViewSet(MultiSerializerViewSetMixin, BaseModelViewSet):
+    queryset = Quiz.objects.prefetch_related('questions', 'tasks__grading_criteria')
+    serializers = {
+        'default': QuizSerializer,
+        'list': QuizListSerializer,
+    }
     permission_classes = [IsAuthenticated]
+    filter_param_map = {
+        'course_id': 'course_id',
+        'section_id': 'section_id',
+        'lecture_id': 'lecture_id',
+    }
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        course_id = self.request.query_params.get('course_id')
-        section_id = self.request.query_params.get('section_id')
-        lecture_id = self.request.query_params.get('lecture_id')
-        
-        if course_id:
-            queryset = queryset.filter(course_id=course_id)
-        if section_id:
-            queryset = queryset.filter(section_id=section_id)
-        if lecture_id:
-            queryset = queryset.filter(lecture_id=lecture_id)
-            
         # Students can only see published quizzes
         if not self.request.user.is_staff and not self.request.user.is_instructor:
             queryset = queryset.filter(is_published=True)
-            
+        if self.action == 'list':
+            queryset = queryset.defer('description', 'instructions')
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        # The newest updated_at and the row count identify the state of the listed quizzes;
+        # any save, publish toggle or nested save/delete (assessments.signals) moves one of them
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.aggregate(last_updated=Max('updated_at'), total=Count('id'))
+        if request.user.is_staff:
+            user_kind = 'staff'
+        elif request.user.is_instructor:
+            user_kind = 'instructor'
+        else:
+            user_kind = 'student'
+        path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        last_updated = state['last_updated'].timestamp() if state['last_updated'] else 0
+
+        cache_key = f"quizzes:{user_kind}:{path_hash}:{last_updated}:{state['total']}"
+        data = cache.get(cache_key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            cache.set(cache_key, response.data, 300)
+            return response
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Probe updated_at first; the nested rendering is cached per version of the quiz
+        probe = self.filter_queryset(self.get_queryset()).prefetch_related(None).only('updated_at')
+        quiz = get_object_or_404(probe, pk=kwargs['pk'])
+        self.check_object_permissions(request, quiz)
+
+        cache_key = f"quiz:{quiz.pk}:{quiz.updated_at.timestamp()}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_serializer(self.get_object()).data
+            cache.set(cache_key, data, 3600)
+        return Response(data)
+
     def perform_create(self, serializer):
         # Ensure the user has permission to create quizzes for this course
-        course_id = serializer.validated_data.get('course_id')
-        if not IsCourseInstructor().has_object_permission(self.request, self, course_id):
+        course = serializer.validated_data.get('course')
+        if not course or not self.is_course_instructor(course.pk):
             raise PermissionDenied("You don't have permission to create quizzes for this course")
         serializer.save()
 
@@ -45,57 +97,43 @@ class QuizViewSet(BaseModelViewSet):
     def publish(self, request, pk=None):
         quiz = self.get_object()
         quiz.is_published = True
-        quiz.save()
+        quiz.save(update_fields=['is_published', 'updated_at'])
         return Response({'status': 'published'})
 
     @action(detail=True, methods=['post'])
     def unpublish(self, request, pk=None):
         quiz = self.get_object()
         quiz.is_published = False
-        quiz.save()
+        quiz.save(update_fields=['is_published', 'updated_at'])
         return Response({'status': 'unpublished'})
 
 class QuizQuestionViewSet(BaseModelViewSet):
     queryset = QuizQuestion.objects.all()
     serializer_class = QuizQuestionSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        quiz_id = self.request.query_params.get('quiz_id')
-        lecture_id = self.request.query_params.get('lecture_id')
-        
-        if quiz_id:
-            queryset = queryset.filter(quiz_id=quiz_id)
-        if lecture_id:
-            queryset = queryset.filter(quiz__lecture_id=lecture_id)
-        return queryset
+    filter_param_map = {
+        'quiz_id': 'quiz_id',
+        'lecture_id': 'quiz__lecture_id',
+    }
 
     def perform_create(self, serializer):
         quiz = serializer.validated_data['quiz']
-        if not IsCourseInstructor().has_object_permission(self.request, self, quiz.course_id):
+        if not self.is_course_instructor(quiz.course_id):
             raise PermissionDenied("You don't have permission to add questions to this quiz")
         serializer.save()
 
 class QuizTaskViewSet(BaseModelViewSet):
-    queryset = QuizTask.objects.all()
+    queryset = QuizTask.objects.prefetch_related('grading_criteria')
     serializer_class = QuizTaskSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        quiz_id = self.request.query_params.get('quiz_id')
-        lecture_id = self.request.query_params.get('lecture_id')
-        
-        if quiz_id:
-            queryset = queryset.filter(quiz_id=quiz_id)
-        if lecture_id:
-            queryset = queryset.filter(quiz__lecture_id=lecture_id)
-        return queryset
+    filter_param_map = {
+        'quiz_id': 'quiz_id',
+        'lecture_id': 'quiz__lecture_id',
+    }
 
     def perform_create(self, serializer):
         quiz = serializer.validated_data['quiz']
-        if not IsCourseInstructor().has_object_permission(self.request, self, quiz.course_id):
+        if not self.is_course_instructor(quiz.course_id):
             raise PermissionDenied("You don't have permission to add tasks to this quiz")
         serializer.save()
 
@@ -104,40 +142,38 @@ class GradingCriterionViewSet(BaseModelViewSet):
     queryset = GradingCriterion.objects.all()
     serializer_class = GradingCriterionSerializer
     permission_classes = [IsAuthenticated]
+    filter_param_map = {'task_id': 'task_id'}
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        task_id = self.request.query_params.get('task_id')
-        if task_id:
-            queryset = queryset.filter(task_id=task_id)
-        return queryset
-
-class QuizSubmissionViewSet(BaseModelViewSet):
-    queryset = QuizSubmission.objects.all()
-    serializer_class = QuizSubmissionSerializer
+class QuizSubmissionViewSet(MultiSerializerViewSetMixin, BaseModelViewSet):
+    queryset = QuizSubmission.objects.prefetch_related('files', 'question_responses')
+    serializers = {
+        'default': QuizSubmissionSerializer,
+        'list': QuizSubmissionListSerializer,
+    }
     permission_classes = [IsAuthenticated]
+    pagination_class = SubmissionCursorPagination
+    filter_param_map = {'quiz_id': 'quiz_id'}
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        quiz_id = self.request.query_params.get('quiz_id')
-        if quiz_id:
-            queryset = queryset.filter(quiz_id=quiz_id)
         if not self.request.user.is_staff:
             queryset = queryset.filter(student=self.request.user)
+        if self.action == 'list':
+            queryset = queryset.defer('text_response', 'feedback', 'instructor_notes')
+        elif self.action in ('submit', 'auto_grade', 'grade'):
+            # Workflow actions read the quiz but never render the nested relations
+            queryset = queryset.select_related('quiz').prefetch_related(None)
         return queryset
 
     def perform_create(self, serializer):
         quiz = serializer.validated_data['quiz']
         
         # Calculate attempt number
-        last_submission = QuizSubmission.objects.filter(
+        last_attempt = QuizSubmission.objects.filter(
             student=self.request.user,
             quiz=quiz
-        ).order_by('-attempt_number').first()
-        
-        attempt_number = 1
-        if last_submission:
-            attempt_number = last_submission.attempt_number + 1
+        ).aggregate(last=Max('attempt_number'))['last']
+        attempt_number = (last_attempt or 0) + 1
             
         # Check if max attempts reached
         if quiz.max_attempts and attempt_number > quiz.max_attempts:
@@ -162,7 +198,7 @@ class QuizSubmissionViewSet(BaseModelViewSet):
         
         submission.status = 'submitted'
         submission.submitted_at = timezone.now()
-        submission.save()
+        submission.save(update_fields=['status', 'submitted_at', 'time_spent_seconds', 'updated_at'])
         
         return Response({'status': 'submitted'})
 
@@ -176,115 +212,132 @@ class QuizSubmissionViewSet(BaseModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
             
-        # Auto-grade multiple choice questions
-        total_points = 0
-        possible_points = 0
-        
-        for response in submission.question_responses.all():
-            question = response.question
-            
-            if question.question_type in ['multiple_choice', 'true_false']:
-                response.is_correct = (response.answer == question.correct_option_index)
-                if response.is_correct:
-                    response.points_awarded = question.points
-                else:
-                    response.points_awarded = 0
-                response.save()
-            
-            if question.question_type in ['short_answer'] and question.correct_answer:
-                # Simple exact match for short answer
-                response.is_correct = (str(response.answer).strip().lower() == str(question.correct_answer).strip().lower())
-                if response.is_correct:
-                    response.points_awarded = question.points
-                else:
-                    response.points_awarded = 0
-                response.save()
-            
-            if hasattr(response, 'points_awarded'):
-                total_points += response.points_awarded
-            possible_points += question.points
-        
-        # Calculate percentage score
-        if possible_points > 0:
-            percentage_score = (total_points / possible_points) * 100
-        else:
-            percentage_score = 0
-            
-        # Create or update grade
-        grade, created = QuizGrade.objects.update_or_create(
-            quiz=submission.quiz,
-            student=submission.student,
-            defaults={
-                'overall_score': percentage_score,
-                'graded_by': request.user if request.user.is_staff else None,
-                'is_final': False
-            }
-        )
-        
-        submission.grade = percentage_score
-        submission.status = 'graded'
-        submission.save()
-        
+        graded_by_id = str(request.user.pk) if request.user.is_staff else None
+
+        # Large submissions are graded on a worker when a threshold is configured
+        threshold = getattr(settings, 'ASSESSMENTS_ASYNC_GRADING_THRESHOLD', None)
+        if threshold is not None and submission.question_responses.count() > threshold:
+            task = grade_submission.delay(str(submission.pk), graded_by_id)
+            return Response({'status': 'grading', 'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
+
+        percentage_score = grade_submission(submission.pk, graded_by_id)
         return Response({'status': 'graded', 'score': percentage_score})
 
+    @action(detail=True, methods=['post'])
+    def grade(self, request, pk=None):
+        submission = self.get_object()
+        if not self.is_course_instructor(submission.quiz.course_id):
+            raise PermissionDenied("You don't have permission to grade this submission")
+
+        serializer = SubmissionGradeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        task_grades = data.get('task_grades', [])
+
+        # Validate every referenced task and criterion with one query each
+        task_ids = {item['task'] for item in task_grades}
+        quiz_task_ids = set(
+            QuizTask.objects.filter(quiz_id=submission.quiz_id, pk__in=task_ids).values_list('pk', flat=True)
+        )
+        if task_ids - quiz_task_ids:
+            return Response(
+                {'error': 'Task grades must reference tasks of this quiz'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        criterion_ids = {c['criterion'] for item in task_grades for c in item.get('criteria_grades', [])}
+        criterion_tasks = dict(
+            GradingCriterion.objects.filter(pk__in=criterion_ids).values_list('pk', 'task_id')
+        )
+        for item in task_grades:
+            for criteria_grade in item.get('criteria_grades', []):
+                if criterion_tasks.get(criteria_grade['criterion']) != item['task']:
+                    return Response(
+                        {'error': 'Criteria grades must reference criteria of their task'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+        with transaction.atomic():
+            grade, created = QuizGrade.objects.update_or_create(
+                quiz_id=submission.quiz_id,
+                student_id=submission.student_id,
+                defaults={
+                    'overall_score': data['overall_score'],
+                    'feedback': data.get('feedback'),
+                    'graded_by': request.user,
+                    'is_final': data['is_final']
+                }
+            )
+            grade.task_grades.all().delete()
+
+            new_task_grades = []
+            new_criteria_grades = []
+            for item in task_grades:
+                task_grade = TaskGrade(
+                    grade=grade,
+                    task_id=item['task'],
+                    score=item['score'],
+                    feedback=item.get('feedback')
+                )
+                new_task_grades.append(task_grade)
+                new_criteria_grades.extend(
+                    CriteriaGrade(
+                        task_grade=task_grade,
+                        criterion_id=criteria_grade['criterion'],
+                        awarded_points=criteria_grade['awarded_points'],
+                        comments=criteria_grade.get('comments')
+                    )
+                    for criteria_grade in item.get('criteria_grades', [])
+                )
+            TaskGrade.objects.bulk_create(new_task_grades, batch_size=1000)
+            CriteriaGrade.objects.bulk_create(new_criteria_grades, batch_size=1000)
+
+            submission.grade = data['overall_score']
+            submission.status = 'graded'
+            submission.save(update_fields=['grade', 'status', 'updated_at'])
+
+        return Response({'status': 'graded', 'score': data['overall_score']})
+
 class QuestionResponseViewSet(BaseModelViewSet):
     queryset = QuestionResponse.objects.all()
     serializer_class = QuestionResponseSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        submission_id = self.request.query_params.get('submission_id')
-        if submission_id:
-            queryset = queryset.filter(submission_id=submission_id)
-        return queryset
+    filter_param_map = {'submission_id': 'submission_id'}
 
 class SubmissionFileViewSet(BaseModelViewSet):
     queryset = SubmissionFile.objects.all()
     serializer_class = SubmissionFileSerializer
     permission_classes = [IsAuthenticated]
+    filter_param_map = {'submission_id': 'submission_id'}
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        submission_id = self.request.query_params.get('submission_id')
-        if submission_id:
-            queryset = queryset.filter(submission_id=submission_id)
-        return queryset
-
-class QuizGradeViewSet(BaseModelViewSet):
-    queryset = QuizGrade.objects.all()
-    serializer_class = QuizGradeSerializer
+class QuizGradeViewSet(MultiSerializerViewSetMixin, BaseModelViewSet):
+    queryset = QuizGrade.objects.prefetch_related('task_grades__criteria_grades')
+    serializers = {
+        'default': QuizGradeSerializer,
+        'list': QuizGradeListSerializer,
+    }
     permission_classes = [IsAuthenticated]
+    pagination_class = GradeCursorPagination
+    filter_param_map = {'quiz_id': 'quiz_id'}
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        quiz_id = self.request.query_params.get('quiz_id')
-        if quiz_id:
-            queryset = queryset.filter(quiz_id=quiz_id)
         if not self.request.user.is_staff:
             queryset = queryset.filter(student=self.request.user)
-        return queryset
+        if self.action == 'list':
+            queryset = queryset.defer('feedback')
+        task_score_total = TaskGrade.objects.filter(grade=OuterRef('pk')).values('grade').annotate(
+            total=Sum('score')
+        ).values('total')
+        return queryset.annotate(computed_total=Coalesce(Subquery(task_score_total), Value(0.0)))
 
 class TaskGradeViewSet(BaseModelViewSet):
-    queryset = TaskGrade.objects.all()
+    queryset = TaskGrade.objects.prefetch_related('criteria_grades')
     serializer_class = TaskGradeSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        grade_id = self.request.query_params.get('grade_id')
-        if grade_id:
-            queryset = queryset.filter(grade_id=grade_id)
-        return queryset
+    filter_param_map = {'grade_id': 'grade_id'}
 
 class CriteriaGradeViewSet(BaseModelViewSet):
     queryset = CriteriaGrade.objects.all()
     serializer_class = CriteriaGradeSerializer
     permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        task_grade_id = self.request.query_params.get('task_grade_id')
-        if task_grade_id:
-            queryset = queryset.filter(task_grade_id=task_grade_id)
-        return queryset
\ No newline at end of file
+    filter_param_map = {'task_grade_id': 'task_grade_id'}
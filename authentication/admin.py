@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import User, Profile
+from core.utils import DeferredChangeListMixin
+from users.models import UserProfile, UserPreference, UserRole, UserDevice
+from .models import User, Profile, forget_cached_users
 
 
 class ProfileInline(admin.StackedInline):
@@ -15,10 +17,39 @@ class ProfileInline(admin.StackedInline):
     extra = 0
 
 
+class UserProfileInline(admin.StackedInline):
+    model = UserProfile
+    can_delete = False
+    verbose_name_plural = 'Extended Profile'
+    fk_name = 'user'
+
+
+class UserPreferenceInline(admin.StackedInline):
+    model = UserPreference
+    can_delete = False
+    verbose_name_plural = 'Preferences'
+
+
+class UserRoleInline(admin.TabularInline):
+    model = UserRole
+    extra = 1
+    fk_name = 'user'
+    verbose_name_plural = 'Additional Roles'
+
+
+class UserDeviceInline(admin.TabularInline):
+    model = UserDevice
+    extra = 1
+    verbose_name_plural = 'Devices'
+
+
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(DeferredChangeListMixin, BaseUserAdmin):
     # Inherit from BaseUserAdmin but customize for email-based authentication
-    inlines = [ProfileInline]
+    inlines = [
+        ProfileInline, UserProfileInline, UserPreferenceInline,
+        UserRoleInline, UserDeviceInline
+    ]
     
     list_display = [
         'email', 'full_name_display', 'user_type', 'profile_completion_display',
@@ -34,6 +65,9 @@ class UserAdmin(BaseUserAdmin):
     
     ordering = ['-created_at']
     
+    # Columns the changelist never renders
+    changelist_deferred_fields = ('password', 'last_login', 'phone_number', 'updated_at')
+    
     readonly_fields = [
         'created_at', 'updated_at', 'last_login', 
         'profile_completion_percentage', 'is_profile_complete'
@@ -128,16 +162,21 @@ class UserAdmin(BaseUserAdmin):
         if obj.profile_picture:
             return format_html(
                 '<img src="{}" width="30" height="30" style="border-radius: 50%;" />',
-                obj.profile_picture.url
+                obj.profile_picture_url
             )
         return format_html('<span style="color: #6c757d;">No image</span>')
     profile_picture_display.short_description = 'Avatar'
     
     # Custom actions
-    actions = ['make_active', 'make_inactive', 'promote_to_instructor', 'demote_to_student']
+    actions = [
+        'make_active', 'make_inactive', 'promote_to_instructor', 'demote_to_student',
+        'recalculate_profile_completion'
+    ]
     
     def make_active(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=True)
+        forget_cached_users(user_ids)
         self.message_user(
             request,
             f'{updated} user(s) were successfully marked as active.'
@@ -145,7 +184,9 @@ class UserAdmin(BaseUserAdmin):
     make_active.short_description = 'Mark selected users as active'
     
     def make_inactive(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=False)
+        forget_cached_users(user_ids)
         self.message_user(
             request,
             f'{updated} user(s) were successfully marked as inactive.'
@@ -153,9 +194,11 @@ class UserAdmin(BaseUserAdmin):
     make_inactive.short_description = 'Mark selected users as inactive'
     
     def promote_to_instructor(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.filter(user_type=User.Types.STUDENT).update(
             user_type=User.Types.INSTRUCTOR
         )
+        forget_cached_users(user_ids)
         self.message_user(
             request,
             f'{updated} student(s) were successfully promoted to instructor.'
@@ -163,15 +206,31 @@ class UserAdmin(BaseUserAdmin):
     promote_to_instructor.short_description = 'Promote students to instructors'
     
     def demote_to_student(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.filter(user_type=User.Types.INSTRUCTOR).update(
             user_type=User.Types.STUDENT
         )
+        forget_cached_users(user_ids)
         self.message_user(
             request,
             f'{updated} instructor(s) were successfully demoted to student.'
         )
     demote_to_student.short_description = 'Demote instructors to students'
     
+    def recalculate_profile_completion(self, request, queryset):
+        updated = User.objects.recalculate_completion_bulk(queryset)
+        self.message_user(
+            request,
+            f'Profile completion was recalculated for {updated} user(s).'
+        )
+    recalculate_profile_completion.short_description = 'Recalculate profile completion'
+    
+    def get_inline_instances(self, request, obj=None):
+        """Only show inlines for existing users, not when adding new users"""
+        if not obj:
+            return []
+        return super().get_inline_instances(request, obj)
+    
     # Override get_queryset to add annotations for better performance
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
@@ -0,0 +1,48 @@
+# authentication/authentication.py
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .models import AUTH_USER_CACHE_TIMEOUT, auth_user_cache_enabled, auth_user_cache_key
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the token's user, with its profile joined,
+    in the cache for a minute so authenticated requests skip the user query.
+    Saving or deleting a user or profile drops the cached copy. Caching is
+    skipped when the default cache is process-local (see CACHES).
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        use_cache = auth_user_cache_enabled()
+        cache_key = auth_user_cache_key(user_id)
+        user = cache.get(cache_key) if use_cache else None
+        if user is None:
+            try:
+                user = self.user_model.objects.select_related('profile').get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if use_cache:
+                cache.set(cache_key, user, AUTH_USER_CACHE_TIMEOUT)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.17 on 2026-10-17 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_user_user_type'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='authenticat_user_ty_277406_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('user_type', 'INSTRUCTOR')), fields=['user_type'], name='idx_user_instructors'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('user_type', 'ADMIN')), fields=['user_type'], name='idx_user_admins'),
+        ),
+    ]
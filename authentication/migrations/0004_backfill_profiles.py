@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    Profile = apps.get_model('authentication', 'Profile')
+    missing = User.objects.filter(profile__isnull=True).values_list('pk', flat=True)
+    Profile.objects.bulk_create(
+        [Profile(user_id=user_id) for user_id in missing.iterator()],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_user_type_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
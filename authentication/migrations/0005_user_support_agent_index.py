@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-17 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_backfill_profiles'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('user_type', 'SUPPORT_AGENT')), fields=['user_type'], name='idx_user_support_agents'),
+        ),
+    ]
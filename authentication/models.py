@@ -1,8 +1,35 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
-import threading
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models, transaction
+from django.db.models.lookups import GreaterThanOrEqual
+import hashlib
 
-_thread_locals = threading.local()
+# Users cached by CachedJWTAuthentication
+AUTH_USER_CACHE_TIMEOUT = 60
+
+
+# Profile completion scores four user and four profile fields
+PROFILE_COMPLETION_FIELD_COUNT = 8
+PROFILE_COMPLETE_PERCENTAGE = 80
+
+
+def auth_user_cache_enabled():
+    """
+    Cached users are only dropped from the cache the saving process sees,
+    so caching them is safe only when every worker shares that cache
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def auth_user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def forget_cached_users(user_ids):
+    """Drop cached authentication users, e.g. after a queryset update() on them"""
+    cache.delete_many([auth_user_cache_key(user_id) for user_id in user_ids])
 
 
 # ────────────────
@@ -21,35 +48,123 @@ class UserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def bulk_create_users(self, users_data, batch_size=500):
+        """
+        Create users with batched INSERTs. bulk_create sends no signals, so
+        the rows the post_save receivers add for a new user (Profile, the
+        users app's UserProfile and UserPreference, and NotificationPreference)
+        and the completion fields are filled in here. A new user owns no
+        ebooks yet, so the ebook creator receiver has nothing to add.
+        Each item is a dict of User fields with "email" and "password".
+        """
+        from notifications.models import NotificationPreference
+        from users.models import UserPreference, UserProfile
+
+        users = []
+        for data in users_data:
+            data = dict(data)
+            password = data.pop("password", None)
+            user = self.model(email=self.normalize_email(data.pop("email")), **data)
+            user.set_password(password)
+            # No profile yet, so this scores like create_user's empty profile
+            user.apply_profile_completion(user.compute_profile_completion())
+            users.append(user)
+
+        with transaction.atomic(using=self.db):
+            users = self.bulk_create(users, batch_size=batch_size)
+            for related_model in (Profile, UserProfile, UserPreference, NotificationPreference):
+                related_model.objects.using(self.db).bulk_create(
+                    [related_model(user_id=user.pk) for user in users],
+                    batch_size=batch_size,
+                )
+        return users
+
+    # user_type -> defaults for that role; explicit keyword arguments still win
+    _ROLE_DEFAULTS = {
+        "SUPPORT_AGENT": {"is_staff": True},
+        "ADMIN": {"is_staff": True, "is_superuser": True},
+    }
+
+    def create_for_role(self, role, email, password=None, **extra_fields):
+        return self.create_user(
+            email, password, **{"user_type": role, **self._ROLE_DEFAULTS.get(role, {}), **extra_fields}
+        )
+
     def create_student(self, email, password=None, **extra_fields):
-        extra_fields.setdefault("user_type", User.Types.STUDENT)
-        return self.create_user(email, password, **extra_fields)
+        return self.create_for_role(User.Types.STUDENT, email, password, **extra_fields)
 
     def create_instructor(self, email, password=None, **extra_fields):
-        extra_fields.setdefault("user_type", User.Types.INSTRUCTOR)
-        return self.create_user(email, password, **extra_fields)
+        return self.create_for_role(User.Types.INSTRUCTOR, email, password, **extra_fields)
 
     def create_support_agent(self, email, password=None, **extra_fields):
-        extra_fields.setdefault("user_type", User.Types.SUPPORT_AGENT)
-        extra_fields.setdefault("is_staff", True)
-        return self.create_user(email, password, **extra_fields)
+        return self.create_for_role(User.Types.SUPPORT_AGENT, email, password, **extra_fields)
 
     def create_admin(self, email, password=None, **extra_fields):
-        extra_fields.setdefault("user_type", User.Types.ADMIN)
-        extra_fields.setdefault("is_staff", True)
-        extra_fields.setdefault("is_superuser", True)
-        return self.create_user(email, password, **extra_fields)
+        return self.create_for_role(User.Types.ADMIN, email, password, **extra_fields)
 
     def create_superuser(self, email, password=None, **extra_fields):
         return self.create_admin(email, password, **extra_fields)
 
     def create_ebook_creator(self, email, password=None, **extra_fields):
-        extra_fields.setdefault("user_type", User.Types.EBOOK_CREATOR)
-        return self.create_user(email, password, **extra_fields)
+        return self.create_for_role(User.Types.EBOOK_CREATOR, email, password, **extra_fields)
 
     def create_premium_member(self, email, password=None, **extra_fields):
-        extra_fields.setdefault("user_type", User.Types.PREMIUM_MEMBER)
-        return self.create_user(email, password, **extra_fields)
+        return self.create_for_role(User.Types.PREMIUM_MEMBER, email, password, **extra_fields)
+
+    def recalculate_completion_bulk(self, queryset=None):
+        """
+        Recompute profile completion for the users in queryset (all users by
+        default) in a single UPDATE. Scores the same eight user and profile
+        fields as User.compute_profile_completion, and drops the updated
+        users from the authentication cache.
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        # Captured first: the update can change which rows a filtered queryset matches
+        user_ids = list(queryset.values_list("pk", flat=True))
+
+        completed = (
+            _filled(~models.Q(first_name=""))
+            + _filled(~models.Q(last_name=""))
+            + _filled(~models.Q(phone_number=""))
+            + _filled(models.Q(profile_picture__isnull=False) & ~models.Q(profile_picture=""))
+            + _profile_filled("bio")
+            + _profile_filled("location")
+            + _profile_filled("website")
+            + _profile_filled("company")
+        )
+        # Integer division truncates like the Python scoring does
+        updated = queryset.update(
+            profile_completion_percentage=completed * 100 / PROFILE_COMPLETION_FIELD_COUNT,
+            is_profile_complete=models.Case(
+                models.When(
+                    GreaterThanOrEqual(
+                        completed * 100 / PROFILE_COMPLETION_FIELD_COUNT, PROFILE_COMPLETE_PERCENTAGE
+                    ),
+                    then=models.Value(True),
+                ),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            ),
+        )
+        forget_cached_users(user_ids)
+        return updated
+
+
+def _filled(condition):
+    """1 when the condition holds for the row, else 0"""
+    return models.Case(
+        models.When(condition, then=models.Value(1)),
+        default=models.Value(0),
+        output_field=models.IntegerField(),
+    )
+
+
+def _profile_filled(field):
+    """1 when the user's profile has a non-empty value for field, else 0"""
+    return _filled(models.Exists(
+        Profile.objects.filter(user=models.OuterRef("pk")).exclude(**{field: ""})
+    ))
 
 
 # ────────────────
@@ -100,6 +215,18 @@ class User(AbstractBaseUser, PermissionsMixin):
     def display_name(self):
         return self.full_name or self.email.split("@")[0]
 
+    @property
+    def profile_picture_url(self):
+        """
+        Storage URL of the profile picture, cached briefly because remote
+        storages sign a fresh URL on every .url access
+        """
+        if not self.profile_picture:
+            return None
+        name_hash = hashlib.md5(self.profile_picture.name.encode()).hexdigest()
+        cache_key = f"user:{self.pk}:picture_url:{name_hash}"
+        return cache.get_or_set(cache_key, lambda: self.profile_picture.url, 300)
+
     # Role checks
     @property
     def is_admin(self):
@@ -125,46 +252,60 @@ class User(AbstractBaseUser, PermissionsMixin):
     def is_premium_member(self):
         return self.user_type == self.Types.PREMIUM_MEMBER
 
-    def calculate_profile_completion(self):
-        if not hasattr(_thread_locals, "calculating_completion"):
-            _thread_locals.calculating_completion = set()
-
-        key = f"user_{self.pk}"
-        if key in _thread_locals.calculating_completion:
-            return self.profile_completion_percentage
-
-        try:
-            _thread_locals.calculating_completion.add(key)
-
-            fields_present = [
-                bool(self.first_name),
-                bool(self.last_name),
-                bool(self.phone_number),
-                bool(self.profile_picture),
-            ]
-            completed = sum(fields_present)
-            total = len(fields_present)
-
-            percentage = int((completed / total) * 100) if total else 0
-
-            User.objects.filter(pk=self.pk).update(
-                profile_completion_percentage=percentage,
-                is_profile_complete=percentage >= 80,
+    def compute_profile_completion(self):
+        """Completion percentage from the user and profile fields, without saving"""
+        # One bit per filled field; the popcount is the number completed
+        fields_present = (
+            bool(self.first_name)
+            | bool(self.last_name) << 1
+            | bool(self.phone_number) << 2
+            | bool(self.profile_picture) << 3
+        )
+        # A missing profile counts its fields as empty
+        profile = getattr(self, "profile", None)
+        if profile is not None:
+            fields_present |= (
+                bool(profile.bio) << 4
+                | bool(profile.location) << 5
+                | bool(profile.website) << 6
+                | bool(profile.company) << 7
             )
+        return fields_present.bit_count() * 100 // PROFILE_COMPLETION_FIELD_COUNT
 
-            self.profile_completion_percentage = percentage
-            self.is_profile_complete = percentage >= 80
-            return percentage
+    def apply_profile_completion(self, percentage):
+        """Set the completion fields on this instance, without saving"""
+        self.profile_completion_percentage = percentage
+        self.is_profile_complete = percentage >= PROFILE_COMPLETE_PERCENTAGE
+        return percentage
 
-        finally:
-            _thread_locals.calculating_completion.discard(key)
-
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+    def calculate_profile_completion(self):
+        """
+        Recompute and store this user's completion. Saves through update(),
+        which sends no signals, so no recursion guard is needed.
+        """
+        percentage = self.apply_profile_completion(self.compute_profile_completion())
+        User.objects.filter(pk=self.pk).update(
+            profile_completion_percentage=self.profile_completion_percentage,
+            is_profile_complete=self.is_profile_complete,
+        )
+        forget_cached_users([self.pk])
+        return percentage
 
     class Meta:
         indexes = [
-            models.Index(fields=["user_type"]),
+            # user_type is low-cardinality; only the small roles that list views filter on are indexed
+            models.Index(
+                fields=["user_type"], name="idx_user_instructors",
+                condition=models.Q(user_type="INSTRUCTOR"),
+            ),
+            models.Index(
+                fields=["user_type"], name="idx_user_admins",
+                condition=models.Q(user_type="ADMIN"),
+            ),
+            models.Index(
+                fields=["user_type"], name="idx_user_support_agents",
+                condition=models.Q(user_type="SUPPORT_AGENT"),
+            ),
             models.Index(fields=["is_active"]),
             models.Index(fields=["created_at"]),
         ]
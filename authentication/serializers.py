@@ -1,7 +1,17 @@
+import hashlib
+import time
+from operator import attrgetter
+
+from django.core.cache import cache
+from django.db import models
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 from rest_framework_simplejwt.serializers import TokenVerifySerializer, TokenRefreshSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from core.serializers import CachedFieldsModelSerializer
 from .models import User, Profile
 
 
@@ -44,8 +54,11 @@ class SignInSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         try:
-            user = User.objects.get(email=email)
+            # The view renders this user with UserSerializer, so only skip columns nothing reads
+            user = User.objects.defer('last_login', 'is_superuser').get(email=email)
         except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            User().set_password(password)
             raise ValidationError("Invalid credentials")
 
         if not user.check_password(password):
@@ -58,7 +71,7 @@ class SignInSerializer(serializers.Serializer):
         return attrs
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(CachedFieldsModelSerializer):
     name = serializers.ReadOnlyField()
     
     class Meta:
@@ -70,34 +83,106 @@ class ProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'name', 'created_at', 'updated_at']
 
 
-class UserSerializer(serializers.ModelSerializer):
+# user_type -> the is_<role> flags rendered for that type
+_ROLE_FLAGS = {
+    user_type: {
+        'is_admin': user_type == User.Types.ADMIN,
+        'is_instructor': user_type == User.Types.INSTRUCTOR,
+        'is_student': user_type == User.Types.STUDENT,
+        'is_support_agent': user_type == User.Types.SUPPORT_AGENT,
+        'is_ebook_creator': user_type == User.Types.EBOOK_CREATOR,
+        'is_premium_member': user_type == User.Types.PREMIUM_MEMBER,
+    }
+    for user_type in User.Types.values
+}
+_NO_ROLE_FLAGS = dict.fromkeys(_ROLE_FLAGS[User.Types.STUDENT], False)
+
+
+class RoleFlagsMixin:
+    """Adds the is_<role> flags of the user's type to the serialized data"""
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data.update(_ROLE_FLAGS.get(instance.user_type, _NO_ROLE_FLAGS))
+        return data
+
+
+class FastUserListSerializer(serializers.ListSerializer):
+    """
+    Renders a list of users in one pass, working out how to read each field
+    once per list instead of once per row. Columns and properties are read
+    with attrgetter; other fields go through their usual get_attribute.
+    Rows are built here rather than by child.to_representation, so only
+    the RoleFlagsMixin flags are carried over from the child.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        plan = [
+            (field.field_name, self._direct_getter(field), field)
+            for field in self.child._readable_fields
+        ]
+        role_flags = isinstance(self.child, RoleFlagsMixin)
+
+        rows = []
+        for instance in iterable:
+            row = {}
+            for name, getter, field in plan:
+                if getter is not None:
+                    value = getter(instance)
+                else:
+                    try:
+                        value = field.get_attribute(instance)
+                    except SkipField:
+                        continue
+                    if isinstance(value, PKOnlyObject) and value.pk is None:
+                        value = None
+                row[name] = None if value is None else field.to_representation(value)
+            if role_flags:
+                row.update(_ROLE_FLAGS.get(instance.user_type, _NO_ROLE_FLAGS))
+            rows.append(row)
+        return rows
+
+    def _direct_getter(self, field):
+        """attrgetter for a field sourced from a plain column or property, else None"""
+        if len(field.source_attrs) != 1:
+            return None
+        attr = field.source_attrs[0]
+        model = self.child.Meta.model
+        is_column = any(
+            f.attname == attr and not f.is_relation for f in model._meta.concrete_fields
+        )
+        if is_column or isinstance(getattr(model, attr, None), property):
+            return attrgetter(attr)
+        return None
+
+
+class UserSerializer(RoleFlagsMixin, CachedFieldsModelSerializer):
     full_name = serializers.ReadOnlyField()
     display_name = serializers.ReadOnlyField()
     profile_completion_percentage = serializers.ReadOnlyField()
     is_profile_complete = serializers.ReadOnlyField()
     
-    # Role check properties
-    is_admin = serializers.ReadOnlyField()
-    is_instructor = serializers.ReadOnlyField()
-    is_student = serializers.ReadOnlyField()
-    is_support_agent = serializers.ReadOnlyField()
-    is_ebook_creator = serializers.ReadOnlyField()
-    is_premium_member = serializers.ReadOnlyField()
-    
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name', 'display_name',
             'user_type', 'is_staff', 'is_active', 'phone_number', 'profile_picture',
             'profile_completion_percentage', 'is_profile_complete',
-            'is_admin', 'is_instructor', 'is_student', 'is_support_agent',
-            'is_ebook_creator', 'is_premium_member',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = FastUserListSerializer
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Limit a user queryset to the columns this serializer renders"""
+        return queryset.only(
+            'id', 'email', 'first_name', 'last_name', 'user_type', 'is_staff', 'is_active',
+            'phone_number', 'profile_picture', 'profile_completion_percentage',
+            'is_profile_complete', 'created_at', 'updated_at'
+        )
 
 
-class InstructorSerializer(serializers.ModelSerializer):
+class InstructorSerializer(CachedFieldsModelSerializer):
     """Simplified serializer for instructor listings"""
     full_name = serializers.ReadOnlyField()
     profile_completion = serializers.IntegerField(source='profile_completion_percentage')
@@ -105,9 +190,30 @@ class InstructorSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'full_name', 'profile_picture', 'profile_completion']
-        
+        list_serializer_class = FastUserListSerializer
 
-class UserProfileSerializer(serializers.ModelSerializer):
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Limit a user queryset to the columns this serializer renders"""
+        return queryset.only(
+            'id', 'email', 'first_name', 'last_name', 'profile_picture', 'profile_completion_percentage'
+        )
+
+
+class ProfilePrefetchListSerializer(serializers.ListSerializer):
+    """
+    Loads the profiles of a whole list of users in one query before
+    rendering, whichever view built the queryset. Users whose profile was
+    already joined with select_related are left alone.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        users = list(iterable)
+        prefetch_related_objects(users, 'profile')
+        return super().to_representation(users)
+
+
+class UserProfileSerializer(RoleFlagsMixin, CachedFieldsModelSerializer):
     """Combined serializer for User and Profile data"""
     profile = ProfileSerializer(read_only=True)
     full_name = serializers.ReadOnlyField()
@@ -115,40 +221,70 @@ class UserProfileSerializer(serializers.ModelSerializer):
     profile_completion_percentage = serializers.ReadOnlyField()
     is_profile_complete = serializers.ReadOnlyField()
     
-    # Role check properties
-    is_admin = serializers.ReadOnlyField()
-    is_instructor = serializers.ReadOnlyField()
-    is_student = serializers.ReadOnlyField()
-    is_support_agent = serializers.ReadOnlyField()
-    is_ebook_creator = serializers.ReadOnlyField()
-    is_premium_member = serializers.ReadOnlyField()
-    
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name', 'display_name',
             'user_type', 'is_staff', 'is_active', 'phone_number', 'profile_picture',
             'profile_completion_percentage', 'is_profile_complete',
-            'is_admin', 'is_instructor', 'is_student', 'is_support_agent',
-            'is_ebook_creator', 'is_premium_member',
             'profile', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = ProfilePrefetchListSerializer
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join each user's profile and limit both to the columns rendered"""
+        return queryset.select_related('profile').only(
+            'id', 'email', 'first_name', 'last_name', 'user_type', 'is_staff', 'is_active',
+            'phone_number', 'profile_picture', 'profile_completion_percentage',
+            'is_profile_complete', 'created_at', 'updated_at',
+            'profile__id', 'profile__user', 'profile__bio', 'profile__location',
+            'profile__website', 'profile__company', 'profile__timezone',
+            'profile__linkedin_url', 'profile__github_url', 'profile__twitter_url',
+            'profile__email_notifications', 'profile__sms_notifications',
+            'profile__created_at', 'profile__updated_at'
+        )
+
+
+def verified_token_cache_key(token):
+    """Cache key marking a token as recently verified, without storing the token itself"""
+    return f"jwt:verified:{hashlib.sha256(token.encode()).hexdigest()}"
 
 
 class CustomTokenVerifySerializer(TokenVerifySerializer):
-    """Custom token verify serializer that provides better error messages"""
+    """
+    Custom token verify serializer that provides better error messages.
+    Tokens that passed verification are remembered for up to a minute (never
+    past their expiry) so clients polling the endpoint skip the decode.
+    """
+    cache_timeout = 60
+
     def validate(self, attrs):
+        cache_key = verified_token_cache_key(attrs['token'])
+        if cache.get(cache_key):
+            return {}
+
         try:
-            return super().validate(attrs)
+            data = super().validate(attrs)
         except Exception as e:
             raise ValidationError({
                 'token': ['Token is invalid or expired']
             })
 
+        # The signature was just checked, so read the expiry without verifying again
+        expires_in = UntypedToken(attrs['token'], verify=False)['exp'] - time.time()
+        timeout = int(min(self.cache_timeout, expires_in))
+        if timeout > 0:
+            cache.set(cache_key, True, timeout)
+        return data
+
 
 class CustomTokenRefreshSerializer(TokenRefreshSerializer):
     """Custom token refresh serializer that provides better error messages"""
+    # Deliberately uncached, unlike token verification: each refresh mints a new
+    # access token (and, with ROTATE_REFRESH_TOKENS, a new refresh token), so a
+    # cached result would hand out stale tokens and let a rotated token be reused.
     def validate(self, attrs):
         try:
             return super().validate(attrs)
@@ -187,7 +323,8 @@ class UserUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Write only the submitted columns so concurrent changes to others survive
+        instance.save(update_fields=[*validated_data, 'updated_at'])
         # Trigger profile completion calculation
         instance.calculate_profile_completion()
         return instance
@@ -218,7 +355,8 @@ class ChangePasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(required=True)
     
     def validate_old_password(self, value):
-        user = self.context['request'].user
+        # Views pass a freshly loaded user; request.user may be a cached copy
+        user = self.context.get('user', self.context['request'].user)
         if not user.check_password(value):
             raise ValidationError("Old password is incorrect")
         return value
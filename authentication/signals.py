@@ -2,173 +2,120 @@
 
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from authentication.models import User, Profile
+from authentication.models import PROFILE_COMPLETE_PERCENTAGE, User, Profile, forget_cached_users
 # from uni_services.models import InstructorProfile  # Uncomment if you have instructor profiles
 from django.db import transaction
-import threading
 import logging
 from ebooks.models import EbookCollaborator
 
 logger = logging.getLogger(__name__)
 
-# Thread-local storage to track signal processing
-_thread_locals = threading.local()
-
-def get_signal_processing_flag(signal_name, instance_id):
-    """Get signal processing flag for current thread"""
-    if not hasattr(_thread_locals, 'processing'):
-        _thread_locals.processing = set()
-    return f"{signal_name}_{instance_id}" in _thread_locals.processing
-
-def set_signal_processing_flag(signal_name, instance_id, value=True):
-    """Set signal processing flag for current thread"""
-    if not hasattr(_thread_locals, 'processing'):
-        _thread_locals.processing = set()
-    
-    flag = f"{signal_name}_{instance_id}"
-    if value:
-        _thread_locals.processing.add(flag)
-    else:
-        _thread_locals.processing.discard(flag)
-
-
 @receiver(pre_save, sender=User)
 def track_user_type_changes(sender, instance, **kwargs):
     """Track user type changes for profile cleanup"""
     if instance.pk:  # Only for existing users
-        try:
-            original = User.objects.get(pk=instance.pk)
-            instance._original_user_type = original.user_type
-        except User.DoesNotExist:
-            instance._original_user_type = None
+        # Only user_type is needed, so skip loading the full row
+        instance._original_user_type = User.objects.filter(
+            pk=instance.pk
+        ).values_list('user_type', flat=True).first()
     else:
         instance._original_user_type = None
 
 
 @receiver(post_save, sender=User)
-def handle_user_profiles(sender, instance, created, **kwargs):
+@receiver(post_delete, sender=User)
+def forget_cached_auth_user(sender, instance, **kwargs):
+    """Drop the user cached by CachedJWTAuthentication"""
+    forget_cached_users([instance.pk])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def forget_cached_auth_user_profile(sender, instance, **kwargs):
+    """The cached authentication user carries its profile, so drop it too"""
+    forget_cached_users([instance.user_id])
+
+
+# User fields that feed into profile completion
+PROFILE_COMPLETION_FIELDS = frozenset({'first_name', 'last_name', 'phone_number', 'profile_picture'})
+
+
+@receiver(post_save, sender=User)
+def handle_user_profiles(sender, instance, created, update_fields=None, **kwargs):
     """Create related profiles when a user is created or user_type changes"""
-    
-    # Prevent recursion using thread-local flag
-    if get_signal_processing_flag("user_post_save", instance.pk):
+    # Partial saves of other fields (last_login, password, ...) cannot change completion
+    if not created and update_fields is not None and not (update_fields & PROFILE_COMPLETION_FIELDS):
         return
-    
+
+    # No recursion guard needed: the work below never saves the user again
     try:
-        set_signal_processing_flag("user_post_save", instance.pk, True)
-        
-        # Always ensure basic Profile exists
+        # Always ensure basic Profile exists; a brand-new user cannot have one yet
         if created:
-            Profile.objects.get_or_create(user=instance)
+            Profile.objects.create(user=instance)
             logger.info(f"Created basic profile for {instance.email}")
 
-        
-        # Defer profile completion calculation to avoid recursion
-        transaction.on_commit(lambda: calculate_user_profile_completion_safe(instance.pk))
-            
+        # Defer profile completion calculation until the user row is committed
+        user_pk = instance.pk
+        transaction.on_commit(lambda: calculate_user_profile_completion_safe(user_pk))
+
     except Exception as e:
         logger.error(f"Error in handle_user_profiles for {instance.email}: {e}")
-    finally:
-        set_signal_processing_flag("user_post_save", instance.pk, False)
 
 
 @receiver(post_save, sender=Profile)
 def handle_profile_update(sender, instance, created, **kwargs):
     """Handle profile updates to recalculate completion"""
     if not created:  # Only for updates
-        # Defer profile completion calculation
-        transaction.on_commit(lambda: calculate_user_profile_completion_safe(instance.user.pk))
+        # Defer profile completion calculation; user_id avoids fetching the user
+        user_pk = instance.user_id
+        transaction.on_commit(lambda: calculate_user_profile_completion_safe(user_pk))
 
 
 @receiver(post_delete, sender=Profile)
 def cleanup_profile_deletion(sender, instance, **kwargs):
     """Handle cleanup when profile is deleted"""
-    if instance.user:
-        user_pk = instance.user.pk
+    user_pk = instance.user_id
+    if user_pk:
         transaction.on_commit(lambda: calculate_user_profile_completion_safe(user_pk))
-        logger.info(f"Scheduled cleanup after profile deletion for {instance.user.email}")
+        logger.info(f"Scheduled cleanup after profile deletion for user {user_pk}")
 
 
 def calculate_user_profile_completion_safe(user_pk):
     """Safely calculate user profile completion without triggering signals"""
     try:
         user = User.objects.select_related('profile').get(pk=user_pk)
-        
-        # Prevent recursion
-        if get_signal_processing_flag("profile_completion", user_pk):
+
+        # Same eight-field scoring as the model and the bulk recalculation
+        percentage = user.compute_profile_completion()
+        is_complete = percentage >= PROFILE_COMPLETE_PERCENTAGE
+
+        # Most saves leave completion as it was; skip the write then
+        if (user.profile_completion_percentage, user.is_profile_complete) == (percentage, is_complete):
             return
-            
-        try:
-            set_signal_processing_flag("profile_completion", user_pk, True)
-            
-            completion = 0
-            total_fields = 0
-            
-            # Basic user fields (4 fields total)
-            basic_fields = [
-                bool(user.first_name),
-                bool(user.last_name),
-                bool(user.phone_number),
-                bool(user.profile_picture),
-            ]
-            
-            for field in basic_fields:
-                total_fields += 1
-                if field:
-                    completion += 1
-            
-            # Profile fields (if profile exists)
-            try:
-                profile = user.profile
-                profile_fields = [
-                    bool(profile.bio),
-                    bool(profile.location),
-                    bool(profile.website),
-                    bool(profile.company),
-                ]
-                
-                for field in profile_fields:
-                    total_fields += 1
-                    if field:
-                        completion += 1
-                        
-            except Profile.DoesNotExist:
-                # Add profile fields as missing
-                total_fields += 4
-            
-
-            
-            percentage = int((completion / total_fields) * 100) if total_fields > 0 else 0
-            
-            # Use bulk_update to avoid triggering signals
-            User.objects.filter(pk=user_pk).update(
-                profile_completion_percentage=percentage,
-                is_profile_complete=percentage >= 80
-            )
-            
-            logger.debug(f"Updated profile completion for user {user.email}: {percentage}%")
-            
-        finally:
-            set_signal_processing_flag("profile_completion", user_pk, False)
-            
+
+        # A queryset update() saves without sending signals, so this cannot recurse
+        User.objects.filter(pk=user_pk).update(
+            profile_completion_percentage=percentage,
+            is_profile_complete=is_complete
+        )
+        forget_cached_users([user_pk])
+
+        logger.debug(f"Updated profile completion for user {user.email}: {percentage}%")
+
     except User.DoesNotExist:
         logger.warning(f"User with pk {user_pk} not found during profile completion calculation")
     except Exception as e:
         logger.error(f"Error calculating user profile completion for pk {user_pk}: {e}")
 
 
-
 # Utility function to manually recalculate all user profile completions
 def recalculate_all_profile_completions():
-    """Utility function to recalculate all user profile completions"""
+    """Recalculate every user's profile completion through the bulk manager method"""
     logger.info("Starting bulk profile completion recalculation")
-    
-    for user in User.objects.all():
-        try:
-            calculate_user_profile_completion_safe(user.pk)
-        except Exception as e:
-            logger.error(f"Error recalculating profile for user {user.email}: {e}")
-    
-    logger.info("Completed bulk profile completion recalculation")
+
+    updated = User.objects.recalculate_completion_bulk()
+
+    logger.info(f"Completed bulk profile completion recalculation for {updated} users")
 
 
 # Signal connection verification
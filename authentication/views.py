@@ -3,13 +3,16 @@ from django.utils.decorators import method_decorator
 from django.contrib.auth import login, authenticate, logout as django_logout
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework.generics import GenericAPIView
+from rest_framework.pagination import CursorPagination
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenVerifyView, TokenRefreshView
-from authentication.models import User, Profile
+from authentication.models import User, Profile, forget_cached_users
 from authentication.serializers import (
     InstructorSerializer, SignInSerializer, SignUpSerializer, UserSerializer, UserProfileSerializer,
     CustomTokenVerifySerializer, CustomTokenRefreshSerializer,
@@ -20,27 +23,47 @@ from authentication.serializers import (
 # Set up a logger for this module
 logger = logging.getLogger('authentication')
 
+# Request data that marks a UnifiedAuthView call as a sign-up
+_SIGNUP_KEYS = frozenset(('confirm_password',))
+_SIGNUP_ACTIONS = frozenset(('register',))
+
+
+def get_or_create_profile(user):
+    """
+    The user's profile as (profile, created). Profiles are created with the
+    user, so this is normally the profile already joined onto request.user.
+    Read-only: write paths should load the profile fresh.
+    """
+    profile = getattr(user, 'profile', None)
+    if profile is not None:
+        return profile, False
+    # get_or_create tolerates a concurrent request creating it first
+    return Profile.objects.get_or_create(user=user)
+
 
 class UnifiedAuthView(APIView):
     permission_classes = [AllowAny]
+    # Every attempt runs the password hasher, so cap attempts per client
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'auth'
 
     def post(self, request):
-        logger.debug(f"Received request data: {request.data}")
+        logger.debug("Received request data: %s", request.data)
         
         # Check multiple possible indicators for signup
         is_signup = (
-            request.data.get('is_signup', False) or 
-            request.data.get('action') == 'register' or
-            'confirm_password' in request.data
+            bool(request.data.keys() & _SIGNUP_KEYS) or
+            request.data.get('action') in _SIGNUP_ACTIONS or
+            request.data.get('is_signup', False)
         )
         
-        logger.debug(f"Is this a sign-up request? {is_signup}")
+        logger.debug("Is this a sign-up request? %s", is_signup)
 
         if is_signup:
             signup_serializer = SignUpSerializer(data=request.data)
             if signup_serializer.is_valid():
                 user = signup_serializer.save()
-                logger.info(f"User {user.email} registered successfully with type: {user.user_type}")
+                logger.info("User %s registered successfully with type: %s", user.email, user.user_type)
 
                 # Create JWT tokens
                 refresh = RefreshToken.for_user(user)
@@ -55,7 +78,7 @@ class UnifiedAuthView(APIView):
                     'message': 'User registered successfully'
                 }, status=201)
 
-            logger.error(f"Sign-up failed. Validation errors: {signup_serializer.errors}")
+            logger.error("Sign-up failed. Validation errors: %s", signup_serializer.errors)
             return Response({
                 'error': 'Sign-up failed',
                 'details': signup_serializer.errors
@@ -68,7 +91,7 @@ class UnifiedAuthView(APIView):
                 signin_serializer.is_valid(raise_exception=True)
                 user = signin_serializer.validated_data['user']
 
-                logger.info(f"User {user.email} signed in successfully. User type: {user.user_type}")
+                logger.info("User %s signed in successfully. User type: %s", user.email, user.user_type)
 
                 # Create JWT tokens
                 refresh = RefreshToken.for_user(user)
@@ -84,7 +107,7 @@ class UnifiedAuthView(APIView):
                 }, status=200)
 
             except ValidationError as e:
-                logger.error(f"Sign-in failed. Validation error: {e.detail}")
+                logger.error("Sign-in failed. Validation error: %s", e.detail)
                 return Response({
                     'error': 'Sign-in failed',
                     'details': e.detail
@@ -95,20 +118,20 @@ class LogoutView(APIView):
 
     def post(self, request):
         refresh_token = request.data.get('refresh')
-        logger.info(f"Attempting to log out user: {request.user.email}")
+        logger.info("Attempting to log out user: %s", request.user.email)
 
         if refresh_token:
             try:
                 token = RefreshToken(refresh_token)
                 token.blacklist()
-                logger.info(f"Refresh token blacklisted for user: {request.user.email}")
+                logger.info("Refresh token blacklisted for user: %s", request.user.email)
             except Exception as e:
-                logger.error(f"Error blacklisting refresh token: {str(e)}")
+                logger.error("Error blacklisting refresh token: %s", e)
                 return Response({'error': 'Failed to blacklist token'}, status=400)
 
         # Django session logout
         django_logout(request)
-        logger.info(f"User {request.user.email} logged out successfully.")
+        logger.info("User %s logged out successfully.", request.user.email)
 
         return Response({"message": "Logged out successfully"}, status=200)
 
@@ -121,12 +144,16 @@ class VerifyTokenView(TokenVerifyView):
         serializer = self.get_serializer(data=request.data)
         try:
             serializer.is_valid(raise_exception=True)
-            token_value = request.data.get('token', '[TOKEN_VALUE]')
-            logger.info(f"Token {token_value[:20]}... is valid.")
+            if logger.isEnabledFor(logging.INFO):
+                token_value = request.data.get('token', '[TOKEN_VALUE]')
+                logger.info("Token %s... is valid.", token_value[:20])
             return Response({'detail': 'Token is valid'}, status=200)
         except ValidationError as e:
             token_value = request.data.get('token', '[NOT_PROVIDED]')
-            logger.error(f"Token validation failed for: {token_value[:20] if token_value != '[NOT_PROVIDED]' else token_value}. Validation errors: {e.detail}")
+            logger.error(
+                "Token validation failed for: %s. Validation errors: %s",
+                token_value[:20] if token_value != '[NOT_PROVIDED]' else token_value, e.detail
+            )
             
             if 'token' in e.detail and any('required' in str(error) for error in e.detail['token']):
                 return Response({'detail': 'Token is required'}, status=400)
@@ -135,7 +162,7 @@ class VerifyTokenView(TokenVerifyView):
                 
         except Exception as e:
             token_value = request.data.get('token', '[NOT_PROVIDED]')
-            logger.error(f"Token verification error: {str(e)}")
+            logger.error("Token verification error: %s", e)
             return Response({'detail': 'Token verification failed'}, status=401)
 
 
@@ -147,16 +174,20 @@ class CustomTokenRefreshView(TokenRefreshView):
         serializer = self.get_serializer(data=request.data)
         try:
             serializer.is_valid(raise_exception=True)
-            refresh_token = request.data.get('refresh', '[NOT_PROVIDED]')
-            logger.info(f"Successfully refreshed token for refresh token: {refresh_token[:20]}...")
+            if logger.isEnabledFor(logging.INFO):
+                refresh_token = request.data.get('refresh', '[NOT_PROVIDED]')
+                logger.info("Successfully refreshed token for refresh token: %s...", refresh_token[:20])
             return Response(serializer.validated_data, status=200)
         except ValidationError as e:
             refresh_token = request.data.get('refresh', '[NOT_PROVIDED]')
-            logger.error(f"Token refresh failed for: {refresh_token[:20] if refresh_token != '[NOT_PROVIDED]' else refresh_token}. Errors: {e.detail}")
+            logger.error(
+                "Token refresh failed for: %s. Errors: %s",
+                refresh_token[:20] if refresh_token != '[NOT_PROVIDED]' else refresh_token, e.detail
+            )
             return Response({'detail': 'Token refresh failed'}, status=401)
         except Exception as e:
             refresh_token = request.data.get('refresh', '[NOT_PROVIDED]')
-            logger.error(f"Token refresh error: {str(e)}")
+            logger.error("Token refresh error: %s", e)
             return Response({'detail': 'Token refresh failed'}, status=401)
 
 
@@ -170,10 +201,10 @@ class PasswordResetView(APIView):
             serializer.is_valid(raise_exception=True)
             email = serializer.validated_data['email']
             # Here you would implement your password reset email logic
-            logger.info(f"Password reset requested for email: {email}")
+            logger.info("Password reset requested for email: %s", email)
             return Response({'message': 'Password reset email sent'}, status=200)
         except ValidationError as e:
-            logger.error(f"Password reset request failed: {e.detail}")
+            logger.error("Password reset request failed: %s", e.detail)
             return Response({'error': 'Password reset request failed', 'details': e.detail}, status=400)
 
 
@@ -185,26 +216,29 @@ class UserProfileView(APIView):
         """Get user profile with related profile data"""
         try:
             # Ensure user has a profile
-            profile, created = Profile.objects.get_or_create(user=request.user)
+            profile, created = get_or_create_profile(request.user)
             if created:
-                logger.info(f"Created profile for user: {request.user.email}")
+                logger.info("Created profile for user: %s", request.user.email)
             
             serializer = UserProfileSerializer(request.user)
             return Response(serializer.data)
         except Exception as e:
-            logger.error(f"Error fetching profile for user {request.user.email}: {str(e)}")
+            logger.error("Error fetching profile for user %s: %s", request.user.email, e)
             return Response({'error': 'Failed to fetch profile'}, status=500)
 
     def patch(self, request):
         """Update user basic information"""
-        serializer = UserUpdateSerializer(request.user, data=request.data, partial=True)
+        # request.user may come from the authentication cache; write to the current row
+        user = User.objects.get(pk=request.user.pk)
+        serializer = UserUpdateSerializer(user, data=request.data, partial=True)
         try:
             serializer.is_valid(raise_exception=True)
             user = serializer.save()
-            logger.info(f"User profile updated for: {user.email}")
+            forget_cached_users([user.pk])
+            logger.info("User profile updated for: %s", user.email)
             return Response(UserSerializer(user).data)
         except ValidationError as e:
-            logger.error(f"Profile update failed for user {request.user.email}: {e.detail}")
+            logger.error("Profile update failed for user %s: %s", request.user.email, e.detail)
             return Response({'error': 'Profile update failed', 'details': e.detail}, status=400)
 
 
@@ -215,31 +249,32 @@ class ProfileView(APIView):
     def get(self, request):
         """Get user's extended profile"""
         try:
-            profile, created = Profile.objects.get_or_create(user=request.user)
+            profile, created = get_or_create_profile(request.user)
             if created:
-                logger.info(f"Created profile for user: {request.user.email}")
+                logger.info("Created profile for user: %s", request.user.email)
             
             serializer = ProfileUpdateSerializer(profile)
             return Response(serializer.data)
         except Exception as e:
-            logger.error(f"Error fetching extended profile for user {request.user.email}: {str(e)}")
+            logger.error("Error fetching extended profile for user %s: %s", request.user.email, e)
             return Response({'error': 'Failed to fetch profile'}, status=500)
 
     def patch(self, request):
         """Update user's extended profile"""
         try:
+            # Not the profile joined onto a possibly cached request.user: save the current row
             profile, created = Profile.objects.get_or_create(user=request.user)
             serializer = ProfileUpdateSerializer(profile, data=request.data, partial=True)
             
             serializer.is_valid(raise_exception=True)
             profile = serializer.save()
-            logger.info(f"Extended profile updated for user: {request.user.email}")
+            logger.info("Extended profile updated for user: %s", request.user.email)
             return Response(ProfileUpdateSerializer(profile).data)
         except ValidationError as e:
-            logger.error(f"Extended profile update failed for user {request.user.email}: {e.detail}")
+            logger.error("Extended profile update failed for user %s: %s", request.user.email, e.detail)
             return Response({'error': 'Profile update failed', 'details': e.detail}, status=400)
         except Exception as e:
-            logger.error(f"Unexpected error updating profile for user {request.user.email}: {str(e)}")
+            logger.error("Unexpected error updating profile for user %s: %s", request.user.email, e)
             return Response({'error': 'Failed to update profile'}, status=500)
 
 
@@ -248,16 +283,18 @@ class ChangePasswordView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
+        # request.user may come from the authentication cache; check and write the current row
+        user = User.objects.get(pk=request.user.pk)
+        serializer = ChangePasswordSerializer(data=request.data, context={'request': request, 'user': user})
         try:
             serializer.is_valid(raise_exception=True)
-            user = request.user
             user.set_password(serializer.validated_data['new_password'])
-            user.save()
-            logger.info(f"Password changed for user: {user.email}")
+            user.save(update_fields=['password', 'updated_at'])
+            forget_cached_users([user.pk])
+            logger.info("Password changed for user: %s", user.email)
             return Response({'message': 'Password changed successfully'}, status=200)
         except ValidationError as e:
-            logger.error(f"Password change failed for user {request.user.email}: {e.detail}")
+            logger.error("Password change failed for user %s: %s", request.user.email, e.detail)
             return Response({'error': 'Password change failed', 'details': e.detail}, status=400)
 
 
@@ -267,11 +304,11 @@ class ProfileCompletionView(APIView):
 
     def get(self, request):
         """Get current profile completion status"""
+        # Signals keep the stored value current, so reading it needs no recalculation
         user = request.user
-        completion_percentage = user.calculate_profile_completion()
-        
+
         return Response({
-            'profile_completion_percentage': completion_percentage,
+            'profile_completion_percentage': user.profile_completion_percentage,
             'is_profile_complete': user.is_profile_complete,
             'user_type': user.user_type,
             'display_name': user.display_name
@@ -279,9 +316,10 @@ class ProfileCompletionView(APIView):
 
     def post(self, request):
         """Force recalculate profile completion"""
-        user = request.user
+        # Score the current row and profile, not a possibly cached request.user
+        user = User.objects.select_related('profile').get(pk=request.user.pk)
         completion_percentage = user.calculate_profile_completion()
-        logger.info(f"Profile completion recalculated for user {user.email}: {completion_percentage}%")
+        logger.info("Profile completion recalculated for user %s: %s%%", user.email, completion_percentage)
         
         return Response({
             'message': 'Profile completion recalculated',
@@ -291,71 +329,85 @@ class ProfileCompletionView(APIView):
 
 
 # Admin and User list views
-class AdminListView(APIView):
+class UserCursorPagination(CursorPagination):
+    # Seeks on created_at instead of counting the user table
+    ordering = '-created_at'
+
+
+class AdminListView(GenericAPIView):
     """List all admin users"""
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
 
     def get(self, request):
         # Check if requesting user is admin or staff
         if not (request.user.is_admin or request.user.is_staff):
             return Response({'error': 'Permission denied'}, status=403)
         
-        admins = User.objects.filter(user_type=User.Types.ADMIN)
-        serializer = UserSerializer(admins, many=True)
+        admins = UserSerializer.setup_eager_loading(User.objects.filter(user_type=User.Types.ADMIN))
+        serializer = UserSerializer(self.paginate_queryset(admins), many=True)
         logger.info("Fetched list of admin users.")
-        return Response(serializer.data, status=200)
+        return self.get_paginated_response(serializer.data)
 
 
-class InstructorListView(APIView):
+class InstructorListView(GenericAPIView):
     """List all instructor users"""
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
 
     def get(self, request):
-        instructors = User.objects.filter(user_type=User.Types.INSTRUCTOR).select_related('profile')
-        serializer = InstructorSerializer(instructors, many=True)
-        return Response(serializer.data, status=200)
+        instructors = InstructorSerializer.setup_eager_loading(
+            User.objects.filter(user_type=User.Types.INSTRUCTOR)
+        )
+        serializer = InstructorSerializer(self.paginate_queryset(instructors), many=True)
+        return self.get_paginated_response(serializer.data)
 
 
-class StudentListView(APIView):
+class StudentListView(GenericAPIView):
     """List all student users"""
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
 
     def get(self, request):
         # Check if requesting user has permission
         if not (request.user.is_admin or request.user.is_instructor or request.user.is_support_agent):
             return Response({'error': 'Permission denied'}, status=403)
             
-        students = User.objects.filter(user_type=User.Types.STUDENT)
-        serializer = UserSerializer(students, many=True)
+        students = UserSerializer.setup_eager_loading(User.objects.filter(user_type=User.Types.STUDENT))
+        serializer = UserSerializer(self.paginate_queryset(students), many=True)
         logger.info("Fetched list of student users.")
-        return Response(serializer.data, status=200)
+        return self.get_paginated_response(serializer.data)
 
 
-class SupportAgentListView(APIView):
+class SupportAgentListView(GenericAPIView):
     """List all support agent users"""
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
 
     def get(self, request):
         # Check if requesting user is admin
         if not request.user.is_admin:
             return Response({'error': 'Permission denied'}, status=403)
             
-        support_agents = User.objects.filter(user_type=User.Types.SUPPORT_AGENT)
-        serializer = UserSerializer(support_agents, many=True)
+        support_agents = UserSerializer.setup_eager_loading(
+            User.objects.filter(user_type=User.Types.SUPPORT_AGENT)
+        )
+        serializer = UserSerializer(self.paginate_queryset(support_agents), many=True)
         logger.info("Fetched list of support agent users.")
-        return Response(serializer.data, status=200)
+        return self.get_paginated_response(serializer.data)
 
 
-class UserListView(APIView):
+class UserListView(GenericAPIView):
     """List all users (admin only)"""
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
 
     def get(self, request):
         # Check if requesting user is admin
         if not request.user.is_admin:
             return Response({'error': 'Permission denied'}, status=403)
             
-        users = User.objects.all().select_related('profile')
-        serializer = UserSerializer(users, many=True)
+        users = UserSerializer.setup_eager_loading(User.objects.all())
+        serializer = UserSerializer(self.paginate_queryset(users), many=True)
         logger.info("Fetched list of all users.")
-        return Response(serializer.data, status=200)
\ No newline at end of file
+        return self.get_paginated_response(serializer.data)
\ No newline at end of file
@@ -1,7 +1,25 @@
+import copy
+
 from rest_framework import serializers
 from .models import HealthCheck
 from django.db.models import Count
 
+
+class CachedFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that introspects its model into fields once per class
+    and hands every instance a fresh copy of them
+    """
+    _cached_fields = {}
+
+    def get_fields(self):
+        cls = type(self)
+        fields = CachedFieldsModelSerializer._cached_fields.get(cls)
+        if fields is None:
+            fields = CachedFieldsModelSerializer._cached_fields[cls] = super().get_fields()
+        # Fields get bound to their parent serializer, so never share them
+        return copy.deepcopy(fields)
+
 class HealthCheckSerializer(serializers.ModelSerializer):
     class Meta:
         model = HealthCheck
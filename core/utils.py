@@ -1,4 +1,12 @@
+import os
+import time
+import uuid
+
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
 from django.db.models import Q
+from django.utils.functional import cached_property
 from rest_framework.response import Response
 from rest_framework import status
 
@@ -21,6 +29,75 @@ class PaginationMixin:
     paginate_by_param = 'page_size'
     max_paginate_by = 100
 
+class FasterAdminPaginator(Paginator):
+    """
+    Admin paginator that reads the planner's row estimate from pg_class
+    instead of running COUNT(*) when the changelist is unfiltered
+    """
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [query.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 (or 0) until the table has been analyzed
+        if not row or row[0] <= 0:
+            return super().count
+        return row[0]
+
+class DeferredChangeListMixin:
+    """
+    ModelAdmin mixin that defers wide columns on the changelist page only,
+    so change forms still load complete rows
+    """
+    changelist_deferred_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        changelist_class = super().get_changelist(request, **kwargs)
+        deferred_fields = self.changelist_deferred_fields
+        if not deferred_fields:
+            return changelist_class
+
+        class DeferredChangeList(changelist_class):
+            def get_queryset(self, request, *args, **kwargs):
+                return super().get_queryset(request, *args, **kwargs).defer(*deferred_fields)
+
+        return DeferredChangeList
+
+class UnicodeJSONEncoder(DjangoJSONEncoder):
+    """
+    JSONField encoder that stores non-ASCII text as UTF-8 instead of
+    \\uXXXX escapes
+    """
+    def __init__(self, *args, **kwargs):
+        kwargs['ensure_ascii'] = False
+        super().__init__(*args, **kwargs)
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7), so new rows land at the end of
+    the primary key index instead of at random pages
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= (rand >> 68) << 64
+    value |= 0b10 << 62
+    value |= rand & ((1 << 62) - 1)
+    return uuid.UUID(int=value)
+
 class QueryFilterMixin:
     """
     Mixin to add query filtering to viewsets
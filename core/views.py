@@ -78,11 +78,38 @@ class BaseModelViewSet(viewsets.ModelViewSet):
     Base viewset with common functionality
     """
     permission_classes = [IsAuthenticated]
+    # Maps query parameter names to queryset lookups applied when present
+    filter_param_map = {}
     
     def get_queryset(self):
         if self.request.user.is_staff:
-            return self.queryset
-        return self.queryset.filter(is_active=True)
+            queryset = self.queryset
+        else:
+            queryset = self.queryset.filter(is_active=True)
+
+        query_params = self.request.query_params
+        for param, lookup in self.filter_param_map.items():
+            value = query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+    def is_course_instructor(self, course_id):
+        """
+        IsCourseInstructor check for a course id, remembered for the rest of
+        the request so repeated creates under one course query it once
+        """
+        if self.request.user.is_staff or self.request.user.is_superuser:
+            return True
+        checked = getattr(self.request, '_instructor_courses', None)
+        if checked is None:
+            checked = self.request._instructor_courses = {}
+        if course_id not in checked:
+            course = Course.objects.select_related('instructor').filter(pk=course_id).first()
+            checked[course_id] = course is not None and IsCourseInstructor().has_object_permission(
+                self.request, self, course
+            )
+        return checked[course_id]
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -495,7 +495,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         
         user = self.get_object()
         user.is_active = True
-        user.save()
+        user.save(update_fields=['is_active', 'updated_at'])
         return success_response(message="User activated successfully")
 
     @action(detail=True, methods=['post'])
@@ -511,7 +511,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         
         user = self.get_object()
         user.is_active = False
-        user.save()
+        user.save(update_fields=['is_active', 'updated_at'])
         return success_response(message="User deactivated successfully")
 
 class UserProfileViewSet(viewsets.ModelViewSet):